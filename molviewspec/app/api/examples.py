@@ -2,15 +2,31 @@
 A collection of MolViewSpec examples that showcase common visualization tasks that can be addressed using the builder.
 """
 
+import asyncio
+import gzip
+import hashlib
+import importlib.util
+import json
+import logging
 import math
-from typing import Literal, TypeAlias, Union
-
-import requests
-from fastapi import APIRouter
-from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
-
+import os
+import re
+import shutil
+import time
+from contextlib import asynccontextmanager
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Callable, Literal, NamedTuple, TypeAlias, Union
+
+import anyio
+import httpx
+import orjson
+from fastapi import APIRouter, Body, FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, ORJSONResponse, Response
+
+from app.api.utils import accepts_gzip
 from app.config import settings
-from molviewspec.builder import Representation, create_builder
+from molviewspec.builder import Representation, Root, create_builder
 from molviewspec.nodes import ComponentExpression
 
 MVSResponse: TypeAlias = Response
@@ -19,12 +35,205 @@ MVSResponse: TypeAlias = Response
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
+_HTTP_CLIENT: httpx.AsyncClient
+"""Client shared by all endpoints fetching data from upstream servers (multiplexes requests over HTTP/2 if `h2` is
+installed)"""
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Compute MVS trees of parameter-free examples and derived CIF test data upfront, index locally cached BCIF files,
+    stop prefetching and release pooled upstream connections on shutdown
+    """
+    # a previous lifespan (e.g. of another test client) ran in a different event loop and closed the client
+    _create_upstream_resources()
+    for state in _PRECOMPUTED_STATES:
+        state()
+    _CACHED_LOCAL_BCIF.update(file.stem for file in (settings.TEST_DATA_DIR / "tmp").glob("*.bcif"))
+    for annotations in settings.TEST_DATA_DIR.glob("*/annotations.cif"):
+        id = annotations.parent.name
+        await _materialize_cif_annotation(id)
+        if (annotations.parent / "molecule.cif").exists():
+            await _materialize_molecule_and_annotation(id)
+    yield
+    for worker in _PREFETCH_WORKERS:
+        worker.cancel()
+    _PREFETCH_WORKERS.clear()
+    await _HTTP_CLIENT.aclose()
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=httpx.Timeout(30, connect=3.05),
+        transport=httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60),
+            http2=importlib.util.find_spec("h2") is not None,
+            # only retries failed connection attempts, requests are never sent twice
+            retries=2,
+        ),
+    )
+
+
+def _create_upstream_resources() -> None:
+    """
+    (Re)create the upstream client, the semaphores bounding upstream requests and the prefetch queue. asyncio primitives
+    are bound to the event loop they are first used in, so every lifespan of the app starts with fresh ones.
+    """
+    global _HTTP_CLIENT, _UPSTREAM_REQUESTS, _VALIDATION_DOWNLOADS, _UPSTREAM_DOWNLOADS, _PREFETCH_QUEUE
+    _HTTP_CLIENT = _create_http_client()
+    _UPSTREAM_REQUESTS = asyncio.Semaphore(16)
+    _VALIDATION_DOWNLOADS = asyncio.Semaphore(8)
+    _UPSTREAM_DOWNLOADS = asyncio.Semaphore(5)
+    _PREFETCH_QUEUE = asyncio.Queue()
+    # entries queued in a previous lifespan were dropped along with its queue
+    _PREFETCH_PENDING.clear()
+
+
+_UPSTREAM_REQUESTS: asyncio.Semaphore
+"""Bounds the total number of concurrent requests to upstream servers, so that bursts wait for a free slot instead of
+failing on connection pool timeouts"""
+_CHUNK_SIZE = 1 << 16
+"""Size of chunks in which downloads and large files are streamed"""
+
+
+class _KeyedLock:
+    """Collection of asyncio locks addressed by key. A lock is discarded once nobody holds or awaits it."""
+
+    def __init__(self) -> None:
+        self._locks: dict[str, tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def __call__(self, key: str) -> AsyncIterator[None]:
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+
+_CACHE_CONTROL = "public, max-age=86400"
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=86400, immutable"
+
+
+class _CachedState(NamedTuple):
+    """Serialized MVS tree along with its entity tag, suitable for memoizing examples that are pure functions of their
+    parameters"""
+
+    content: bytes
+    etag: str
+    gzipped: bytes | None
+    """Precompressed `content`, `None` if compression doesn't pay off"""
+
+    @classmethod
+    def of(cls, builder: Root) -> "_CachedState":
+        # the builder's encoded bytes, rather than decoding them in `get_state` just to encode them again
+        return cls.from_content(builder._get_state_bytes())
+
+    @classmethod
+    def from_content(cls, content: bytes) -> "_CachedState":
+        gzipped = gzip.compress(content, compresslevel=6)
+        return cls(
+            content=content,
+            etag=f'"{hashlib.blake2b(content, digest_size=8).hexdigest()}"',
+            gzipped=gzipped if len(gzipped) < len(content) else None,
+        )
+
+
+class _StateTemplate:
+    """
+    MVS tree of an example that only depends on the entry id. The tree is built and serialized once (on first use) with
+    a placeholder id, trees for concrete ids are then obtained by substituting the placeholder in the serialized form.
+    """
+
+    _PLACEHOLDER = "mvs-template-entry-id"
+
+    def __init__(self, build: Callable[[str], Root]) -> None:
+        self._build = build
+        self.render = lru_cache(maxsize=512)(self._render)
+
+    @cached_property
+    def _content(self) -> str:
+        return self._build(self._PLACEHOLDER).get_state()
+
+    def _render(self, id: str) -> _CachedState:
+        # `id` ends up inside JSON strings, so it has to be escaped accordingly
+        return _CachedState.from_content(self._content.replace(self._PLACEHOLDER, json.dumps(id)[1:-1]).encode())
+
+
+_PRECOMPUTED_STATES: list[Callable[[], _CachedState]] = []
+"""MVS trees of parameter-free examples, computed on server startup"""
+
+
+def _precomputed(build: Callable[[], Root]) -> Callable[[], _CachedState]:
+    """Turn a function building a parameter-free example into one returning its memoized MVS tree"""
+
+    @lru_cache(maxsize=1)
+    def state() -> _CachedState:
+        return _CachedState.of(build())
+
+    _PRECOMPUTED_STATES.append(state)
+    return state
+
+
+def _memoized(build: Callable[..., Root]) -> Callable[..., _CachedState]:
+    """
+    Turn a function building an example from its (hashable) parameters into one returning memoized MVS trees. Arguments
+    have to be passed positionally, so that equal calls share cache entries.
+    """
+
+    @lru_cache(maxsize=256)
+    def state(*args) -> _CachedState:
+        return _CachedState.of(build(*args))
+
+    return state
+
+
+def _cached_response(state: _CachedState, request: Request, immutable: bool = False) -> MVSResponse:
+    """
+    Return a memoized MVS tree, or an empty 304 response if the client already holds this version. Trees that only
+    depend on the requested entry id can be marked as `immutable`, so that browsers don't even revalidate them.
+    """
+    headers = {
+        "ETag": state.etag,
+        "Cache-Control": _IMMUTABLE_CACHE_CONTROL if immutable else _CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request, state.etag):
+        return Response(status_code=304, headers=headers)
+    if state.gzipped is not None and accepts_gzip(request):
+        # GZipMiddleware leaves responses that already declare their encoding alone
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=state.gzipped, media_type="application/json", headers=headers)
+    return Response(content=state.content, media_type="application/json", headers=headers)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Tell whether the client already holds the version of a resource identified by `etag`"""
+    if_none_match = request.headers.get("if-none-match")
+    return if_none_match is not None and etag in (tag.strip() for tag in if_none_match.split(","))
+
 
 @router.get("/load")
-async def download_example(id: str = "1cbs") -> MVSResponse:
+async def download_example(request: Request, id: str = "1cbs") -> MVSResponse:
     """
     Download a minimal example that visualizes a given PDB entry in cartoon representation.
     """
+    return _cached_response(_DOWNLOAD_EXAMPLE.render(id.lower()), request, immutable=True)
+
+
+def _download_example(id: str) -> Root:
     builder = create_builder()
     (
         builder.download(url=_url_for_mmcif(id))
@@ -34,59 +243,81 @@ async def download_example(id: str = "1cbs") -> MVSResponse:
         .representation()
         .color(color="blue")
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
+
+
+_DOWNLOAD_EXAMPLE = _StateTemplate(_download_example)
 
 
 @router.get("/label")
-async def label_example(id: str = "1lap") -> MVSResponse:
+async def label_example(request: Request, id: str = "1lap") -> MVSResponse:
     """
     The minimal example enriched by custom labels and labels read from the CIF source file.
     """
+    return _cached_response(_LABEL_EXAMPLE.render(id.lower()), request, immutable=True)
+
+
+def _label_example(id: str) -> Root:
     builder = create_builder()
     structure = builder.download(url=_url_for_mmcif(id)).parse(format="mmcif").model_structure()
 
     # Reference a residue of interest
-    residue = ComponentExpression(label_asym_id="A", label_seq_id=120)
+    residue = _expr(label_asym_id="A", label_seq_id=120)
 
     # Represent everything as cartoon & color the residue red
     whole = structure.component()
-    (whole.representation().color(color="red", selector=ComponentExpression(label_asym_id="A", label_seq_id=120)))
+    (whole.representation().color(color="red", selector=_expr(label_asym_id="A", label_seq_id=120)))
 
     # label the residues with custom text & focus it
     (structure.component(selector=residue).label(text="ALA 120 A: My Label").focus())
 
     # structure.label_from_source(schema="residue", category_name="my_custom_cif_category")
 
-    return PlainTextResponse(builder.get_state())
+    return builder
+
+
+_LABEL_EXAMPLE = _StateTemplate(_label_example)
 
 
 @router.get("/color")
-async def color_example(id: str = "1cbs") -> MVSResponse:
+async def color_example(request: Request, id: str = "1cbs") -> MVSResponse:
     """
     An example with different representations and coloring for polymer and non-polymer chains.
     """
+    return _cached_response(_COLOR_EXAMPLE.render(id.lower()), request, immutable=True)
+
+
+def _color_example(id: str) -> Root:
     builder = create_builder()
     structure = builder.download(url=_url_for_mmcif(id)).parse(format="mmcif").model_structure()
 
     structure.component(selector="protein").representation(type="cartoon").color(color="white")
 
-    active_site = structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=64))
+    active_site = structure.component(selector=_expr(label_asym_id="A", label_seq_id=64))
     active_site.representation(type="ball_and_stick").color(color="red")
     active_site.tooltip(text="Active Site")
 
     structure.component(selector="ligand").representation(type="ball_and_stick").color_from_source(
         schema="residue", category_name="my_custom_cif_category"
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
+
+
+_COLOR_EXAMPLE = _StateTemplate(_color_example)
 
 
 @router.get("/component")
-async def component_example() -> MVSResponse:
+async def component_example(request: Request) -> MVSResponse:
     """
     Define components by referencing selection expression from a URL. This will select the protein chain A and render it
     in cartoon representation and select the REA ligand in chain B, which will be depicted in ball_and_stick
     representation.
     """
+    return _cached_response(_component_example(), request)
+
+
+@_precomputed
+def _component_example() -> Root:
     builder = create_builder()
     structure = builder.download(url=_url_for_mmcif("1cbs")).parse(format="mmcif").model_structure()
 
@@ -97,24 +328,35 @@ async def component_example() -> MVSResponse:
         schema="chain", uri=f"/data/1cbs/components.cif", format="cif", category_name="mvs_test_component2"
     ).representation(type="ball_and_stick").color(color="yellow")
 
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/symmetry-mates")
-async def symmetry_mates_example(id: str = "1cbs") -> MVSResponse:
+async def symmetry_mates_example(request: Request, id: str = "1cbs") -> MVSResponse:
     """
     Add symmetry mates within a distance threshold.
     """
+    return _cached_response(_SYMMETRY_MATES_EXAMPLE.render(id.lower()), request, immutable=True)
+
+
+def _symmetry_mates_example(id: str) -> Root:
     builder = create_builder()
     (builder.download(url=_url_for_mmcif(id)).parse(format="mmcif").symmetry_mates_structure(radius=5.0))
-    return PlainTextResponse(builder.get_state())
+    return builder
+
+
+_SYMMETRY_MATES_EXAMPLE = _StateTemplate(_symmetry_mates_example)
 
 
 @router.get("/symmetry")
-async def symmetry_example(id: str = "1tqn") -> MVSResponse:
+async def symmetry_indices_example(request: Request, id: str = "1tqn") -> MVSResponse:
     """
     Create symmetry mates by specifying Miller indices.
     """
+    return _cached_response(_SYMMETRY_INDICES_EXAMPLE.render(id.lower()), request, immutable=True)
+
+
+def _symmetry_indices_example(id: str) -> Root:
     builder = create_builder()
     (
         builder.download(url=_url_for_mmcif(id))
@@ -124,14 +366,22 @@ async def symmetry_example(id: str = "1tqn") -> MVSResponse:
         .representation()
         .color(color="#008080")
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
+
+
+_SYMMETRY_INDICES_EXAMPLE = _StateTemplate(_symmetry_indices_example)
 
 
 @router.get("/transform")
-async def transform_example() -> MVSResponse:
+async def transform_example(request: Request) -> MVSResponse:
     """
     Superimpose 4hhb and 1oj6 by transforming the latter.
     """
+    return _cached_response(_transform_example(), request)
+
+
+@_precomputed
+def _transform_example() -> Root:
     builder = create_builder()
 
     # Load first structure and color it red
@@ -168,16 +418,20 @@ async def transform_example() -> MVSResponse:
         .color(color="blue")
     )
 
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/validation")
-async def validation_example(id: str = "1cbs") -> MVSResponse:
+async def validation_example(request: Request, id: str = "1cbs") -> MVSResponse:
     """
     Color a structure by annotation data in JSON.
     :param id: the entry to process
     :return: view spec of a structure that will color residues depending on the number of validation report issues
     """
+    return _cached_response(_VALIDATION_EXAMPLE.render(id.lower()), request, immutable=True)
+
+
+def _validation_example(id: str) -> Root:
     builder = create_builder()
     (
         builder.download(url=_url_for_mmcif(id))
@@ -186,9 +440,12 @@ async def validation_example(id: str = "1cbs") -> MVSResponse:
         .component()
         .representation()
         .color(color="#ffffff")
-        .color_from_uri(schema="residue", uri=f"/data/{id.lower()}/validation", format="json")
+        .color_from_uri(schema="residue", uri=_url_for_validation_data(id), format="json")
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
+
+
+_VALIDATION_EXAMPLE = _StateTemplate(_validation_example)
 
 
 ##############################################################################
@@ -196,31 +453,55 @@ async def validation_example(id: str = "1cbs") -> MVSResponse:
 
 
 @router.get("/data/{id}/molecule")
-async def cif_data_molecule(id: str) -> Response:
+async def cif_data_molecule(request: Request, id: str) -> Response:
     """
     Download the content of `molecule.cif`.
     """
     path = settings.TEST_DATA_DIR / id / "molecule.cif"
-    return FileResponse(path)
+    return _file_response(path, request)
 
 
 @router.get("/data/{id}/cif-annotations")
-async def cif_data_annotation(id: str) -> Response:
+async def cif_data_annotation(request: Request, id: str) -> Response:
     """
     Download the content of `annotations.cif`.
     """
-    annotations = (settings.TEST_DATA_DIR / id / "annotations.cif").read_text()
-    return PlainTextResponse(f"data_{id}_annotations\n{annotations}")
+    path = await _materialize_cif_annotation(id)
+    return _file_response(path, request, media_type="text/plain")
 
 
 @router.get("/data/{id}/molecule-and-cif-annotations")
-async def cif_data_molecule_and_annotation(id: str) -> Response:
+async def cif_data_molecule_and_annotation(request: Request, id: str) -> Response:
     """
     Get a mmCIF structure file with the contents of `annotations.cif` concatenated to the end.
     """
-    mol = (settings.TEST_DATA_DIR / id / "molecule.cif").read_text()
-    annotations = (settings.TEST_DATA_DIR / id / "annotations.cif").read_text()
-    return PlainTextResponse(f"{mol}\n\n{annotations}")
+    path = await _materialize_molecule_and_annotation(id)
+    return _file_response(path, request, media_type="text/plain")
+
+
+async def _materialize_cif_annotation(id: str) -> Path:
+    _checked_data_name(id)
+    return await _materialize(
+        settings.TEST_DATA_DIR / "tmp" / id / "annotations.cif",
+        f"data_{id}_annotations\n".encode(),
+        settings.TEST_DATA_DIR / id / "annotations.cif",
+    )
+
+
+async def _materialize_molecule_and_annotation(id: str) -> Path:
+    _checked_data_name(id)
+    return await _materialize(
+        settings.TEST_DATA_DIR / "tmp" / id / "molecule-and-annotations.cif",
+        settings.TEST_DATA_DIR / id / "molecule.cif",
+        b"\n\n",
+        settings.TEST_DATA_DIR / id / "annotations.cif",
+    )
+
+
+_JSON_LIST_CACHE: dict[str, tuple[int, list[str]]] = {}
+"""Names of JSON annotations per `id`, along with the `st_mtime_ns` of the directory they were listed from"""
+_JSON_DATA_CACHE: dict[tuple[str, str], tuple[int, bytes]] = {}
+"""Content of JSON annotations per `(id, name)`, along with the `st_mtime_ns` of the file they were read from"""
 
 
 @router.get("/data/{id}/json-annotations")
@@ -229,8 +510,21 @@ async def json_list(id: str) -> Response:
     Lists all available JSON annotations for a given `id`.
     """
     path = settings.TEST_DATA_DIR / id
-    names = [f.name[:-5] for f in path.glob("*.json")]
-    return JSONResponse(names)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return ORJSONResponse([])
+    cached = _JSON_LIST_CACHE.get(id)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, await anyio.to_thread.run_sync(_list_json_names, path))
+        _JSON_LIST_CACHE[id] = cached
+    return ORJSONResponse(cached[1])
+
+
+def _list_json_names(path: Path) -> list[str]:
+    with os.scandir(path) as entries:
+        # like glob, skip hidden files
+        return [e.name[:-5] for e in entries if e.name.endswith(".json") and not e.name.startswith(".")]
 
 
 @router.get("/data/{id}/json/{name}")
@@ -239,56 +533,138 @@ async def json_data(id: str, name: str) -> Response:
     Download a specific JSON file. Use the `data/{id}/json-annotations` endpoint to discover available files.
     """
     path = settings.TEST_DATA_DIR / id / f"{name}.json"
-    return FileResponse(path)
+    mtime = path.stat().st_mtime_ns
+    cached = _JSON_DATA_CACHE.get((id, name))
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, await anyio.to_thread.run_sync(path.read_bytes))
+        _JSON_DATA_CACHE[(id, name)] = cached
+    return Response(content=cached[1], media_type="application/json")
 
 
 @router.get("/data/file/{filepath:path}")
-async def file(filepath: str) -> Response:
+async def file(request: Request, filepath: str) -> Response:
     """
     Download a specific file. (Mostly for testing)
     """
     path = settings.TEST_DATA_DIR / filepath
-    return FileResponse(path)
+    return _file_response(path, request)
 
 
 @router.get("/data/{id}/validation")
-async def validation_data(id: str) -> Response:
+async def validation_data(request: Request, id: str) -> Response:
     """
     Fetches PDBe validation data for an entry and composes a JSON color instruction.
     :param id: entry to process
     :return: a JSON that can be understood by Mol* and will color all residues depending on the number of issues
     """
-    response = requests.get(f"https://www.ebi.ac.uk/pdbe/api/validation/residuewise_outlier_summary/entry/{id.lower()}")
+    return _cached_response(await _validation_data(id.lower()), request)
+
+
+@router.get("/data/validation")
+async def validation_data_batch(ids: str) -> Response:
+    """
+    Fetches PDBe validation data for multiple entries at once, see `data/{id}/validation`.
+    :param ids: comma-separated entries to process
+    :return: a JSON object mapping each entry to its color instruction, or to an object with `error` and `status` if
+        that entry could not be processed
+    """
+    # validate all entries upfront, so that a bad id rejects the request before any download starts
+    ids_list = list(dict.fromkeys(_checked_entry_id(id.strip()).lower() for id in ids.split(",") if id.strip()))
+
+    async def fetch(id: str) -> bytes:
+        try:
+            async with _VALIDATION_DOWNLOADS:
+                return (await _validation_data(id)).content
+        except HTTPException as e:
+            # a failing entry doesn't fail the whole batch, its error is reported in place of the color instruction
+            return orjson.dumps({"error": e.detail, "status": e.status_code})
+
+    payloads = await asyncio.gather(*(fetch(id) for id in ids_list))
+    # compose the already serialized payloads instead of parsing and serializing them again
+    content = b"{" + b",".join(orjson.dumps(id) + b":" + p for id, p in zip(ids_list, payloads)) + b"}"
+    return Response(content=content, media_type="application/json")
+
+
+async def _validation_data(id: str) -> _CachedState:
+    """
+    Return serialized color instruction for entry `id` (lowercase). Results are cached in memory and on disk, so that
+    they survive server restarts. Malformed ids are rejected with 422, as they end up in the disk cache path.
+    """
+    _checked_entry_id(id)
+    cached = _VALIDATION_DATA_CACHE.get(id)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    async with _VALIDATION_DATA_LOCKS(id):
+        # another request may have obtained the data while we were waiting for the lock
+        cached = _VALIDATION_DATA_CACHE.get(id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        return await _load_validation_data(id)
+
+
+async def _load_validation_data(id: str) -> _CachedState:
+    disk_file = settings.TEST_DATA_DIR / "tmp" / f"{id}_validation.json"
+    try:
+        age = time.time() - disk_file.stat().st_mtime
+    except FileNotFoundError:
+        age = math.inf
+    if age < _VALIDATION_DATA_TTL:
+        state = _CachedState.from_content(await anyio.to_thread.run_sync(disk_file.read_bytes))
+        _cache_validation_data(id, state, _VALIDATION_DATA_TTL - age)
+        return state
+
+    url = _url_for_pdbe_validation_api(id)
+    try:
+        async with _UPSTREAM_REQUESTS:
+            response = await _HTTP_CLIENT.get(url)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Failed to obtain validation data for {id!r}") from e
+    logger.debug("GET %s: status %s", url, response.status_code)
+    if not response.is_success:
+        # PDBe answers 404 for entries without validation report, anything else is a failure on their side
+        status_code = 404 if response.status_code == 404 else 502
+        raise HTTPException(status_code=status_code, detail=f"Failed to obtain validation data for {id!r}")
     data = response.json()
-    transformed_data = []
-
-    for molecule in data[id.lower()]["molecules"]:
-        for chain in molecule["chains"]:
-            for residue in chain["models"][0]["residues"]:
-                residue_number = residue["residue_number"]
-                asym_id = chain[
-                    "struct_asym_id"
-                ]  # "struct_asym_id" contains label_asym_id, "chain_id" contains auth_asym_id
-                outlier_types = residue["outlier_types"]
-                issue_count = len(outlier_types)
-
-                color = ""
-                if issue_count == 1:
-                    color = "#ffff00"
-                elif issue_count == 2:
-                    color = "#ff8800"
-                elif issue_count >= 3:
-                    color = "#ff0000"
-
-                transformed_residue = {
-                    "label_seq_id": residue_number,
-                    "label_asym_id": asym_id,
-                    "color": color,
-                    "tooltip": ", ".join(outlier_types),
-                }
-                transformed_data.append(transformed_residue)
-
-    return JSONResponse(transformed_data)
+    transformed_data = [
+        {
+            "label_seq_id": residue["residue_number"],
+            "label_asym_id": asym_id,
+            "color": _VALIDATION_COLORS[min(len(outlier_types), 3)],
+            "tooltip": ", ".join(outlier_types),
+        }
+        for molecule in data[id]["molecules"]
+        for chain in molecule["chains"]
+        # "struct_asym_id" contains label_asym_id, "chain_id" contains auth_asym_id
+        for asym_id in (chain["struct_asym_id"],)
+        for residue in chain["models"][0]["residues"]
+        for outlier_types in (residue["outlier_types"],)
+    ]
+
+    state = _CachedState.from_content(orjson.dumps(transformed_data))
+    await anyio.to_thread.run_sync(_write_concatenated, disk_file, (state.content,))
+    _cache_validation_data(id, state, _VALIDATION_DATA_TTL)
+    return state
+
+
+def _cache_validation_data(id: str, state: _CachedState, ttl: float) -> None:
+    _VALIDATION_DATA_CACHE.pop(id, None)
+    if len(_VALIDATION_DATA_CACHE) >= _VALIDATION_DATA_CACHE_SIZE:
+        # entries are kept in insertion order, so this drops the oldest one
+        del _VALIDATION_DATA_CACHE[next(iter(_VALIDATION_DATA_CACHE))]
+    _VALIDATION_DATA_CACHE[id] = (time.monotonic() + ttl, state)
+
+
+_VALIDATION_COLORS = ("", "#ffff00", "#ff8800", "#ff0000")
+"""Residue colors by number of validation issues (3 or more issues are all red)"""
+_VALIDATION_DATA_CACHE: dict[str, tuple[float, _CachedState]] = {}
+"""Transformed validation data by entry id, along with the (monotonic) time when they expire"""
+_VALIDATION_DATA_CACHE_SIZE = 1024
+_VALIDATION_DATA_TTL = 24 * 60 * 60
+"""Time (in seconds) for which transformed validation data are served without asking PDBe again"""
+_VALIDATION_DATA_LOCKS = _KeyedLock()
+"""Makes sure that concurrent cache misses for the same entry only trigger a single request to PDBe"""
+_VALIDATION_DOWNLOADS: asyncio.Semaphore
+"""Bounds the number of concurrent requests to the PDBe validation API triggered by batch requests"""
 
 
 ##############################################################################
@@ -296,8 +672,13 @@ async def validation_data(id: str) -> Response:
 
 
 @router.get("/testing/formats")
-async def testing_formats_example() -> MVSResponse:
+async def testing_formats_example(request: Request) -> MVSResponse:
     """Return state with three proteins loaded in mmCIF, binaryCIF, and PDB format"""
+    return _cached_response(_testing_formats_example(), request)
+
+
+@_precomputed
+def _testing_formats_example() -> Root:
     builder = create_builder()
     parse_cif = (
         builder.download(url=_url_for_mmcif("1tqn"))
@@ -323,16 +704,21 @@ async def testing_formats_example() -> MVSResponse:
         .representation()
         .color(color="red")
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/structures")
-async def testing_structures_example() -> MVSResponse:
+async def testing_structures_example(request: Request) -> MVSResponse:
     """
     Return state with deposited model for 1og2 (dimer, white),
     two assemblies for 1og5 (monomers, blue and cyan);
     and three models for 1wrf (NMR conformations)
     """
+    return _cached_response(_testing_structures_example(), request)
+
+
+@_precomputed
+def _testing_structures_example() -> Root:
     builder = create_builder()
     entry = (
         builder.download(url=_url_for_mmcif("1og2"))
@@ -362,15 +748,20 @@ async def testing_structures_example() -> MVSResponse:
     model_0 = cif_1wrf.model_structure(model_index=0).component().representation().color(color="#CC0000")
     model_1 = cif_1wrf.model_structure(model_index=1).component().representation().color(color="#EE7700")
     model_2 = cif_1wrf.model_structure(model_index=2).component().representation().color(color="#FFFF00")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/symmetry_structures")
-async def testing_symmetry_structures_example(id: str = "1tqn") -> MVSResponse:
+async def testing_symmetry_structures_example(request: Request, id: str = "1tqn") -> MVSResponse:
     """
     Return state with deposited model structure for 1tqn (white),
     along with symmetry structure (blue) and symmetry_mates structure (green).
     """
+    return _cached_response(_testing_symmetry_structures_example(id), request)
+
+
+@_memoized
+def _testing_symmetry_structures_example(id: str) -> Root:
     builder = create_builder()
     structure_url = "http://0.0.0.0:9000/api/v1/examples/data/file/1cbs_2nnj_1tqn.cif"
     model = builder.download(url=structure_url).parse(format="mmcif")
@@ -381,16 +772,21 @@ async def testing_symmetry_structures_example(id: str = "1tqn") -> MVSResponse:
     model.symmetry_mates_structure(block_index=2, radius=40).transform(
         translation=(-130, 0, 0)
     ).component().representation().color(color="green")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/transforms")
-async def testing_transforms_example(id: str = "1cbs") -> MVSResponse:
+async def testing_transforms_example(request: Request, id: str = "1cbs") -> MVSResponse:
     """
     Return state demonstrating different transforms:
     1cbs in original conformation (white), moved (blue), rotated +90 deg around Z (green),
     # and rotated twice(+90 deg around X then +90 deg around Y, orange)
     """
+    return _cached_response(_testing_transforms_example(id), request)
+
+
+@_memoized
+def _testing_transforms_example(id: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif(id)
     model = builder.download(url=structure_url).parse(format="bcif")
@@ -455,15 +851,20 @@ async def testing_transforms_example(id: str = "1cbs") -> MVSResponse:
         .representation()
         .color(color="orange")
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/components")
-async def testing_components_example() -> MVSResponse:
+async def testing_components_example(request: Request) -> MVSResponse:
     """
     Return state demonstrating different static components
     (polymer, ligand, ion, water, branched, protein, nucleic)
     """
+    return _cached_response(_testing_components_example(), request)
+
+
+@_precomputed
+def _testing_components_example() -> Root:
     builder = create_builder()
     struct1 = builder.download(url=_url_for_mmcif("2nnj")).parse(format="mmcif").model_structure()
     struct1.component(selector="polymer").representation(type="cartoon").color(color="white")
@@ -488,14 +889,19 @@ async def testing_components_example() -> MVSResponse:
     )
     struct3.component(selector="protein").representation(type="surface").color(color="white")
     struct3.component(selector="nucleic").representation(type="cartoon").color(color="red")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/color_from_source")
-async def testing_color_from_source_example(tooltips: bool = False) -> MVSResponse:
+async def testing_color_from_source_example(request: Request, tooltips: bool = False) -> MVSResponse:
     """
     Color from the same CIF as structure
     """
+    return _cached_response(_testing_color_from_source_example(tooltips), request)
+
+
+@_memoized
+def _testing_color_from_source_example(tooltips: bool) -> Root:
     builder = create_builder()
     structure_url = f"http://0.0.0.0:9000/api/v1/examples/data/1cbs/molecule-and-cif-annotations"
     structure = builder.download(url=structure_url).parse(format="mmcif").model_structure()
@@ -520,56 +926,59 @@ async def testing_color_from_source_example(tooltips: bool = False) -> MVSRespon
             category_name="mvs_test_chain_label_annotation",
             field_name="color",
         )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/color_rainbow")
-async def testing_color_rainbow_example() -> MVSResponse:
+async def testing_color_rainbow_example(request: Request) -> MVSResponse:
     """
     An example with different representations and coloring for polymer and non-polymer chains.
     """
+    return _cached_response(_testing_color_rainbow_example(), request)
+
+
+@_precomputed
+def _testing_color_rainbow_example() -> Root:
     builder = create_builder()
     structure = builder.download(url=_url_for_mmcif("1cbs")).parse(format="mmcif").model_structure()
-    structure.component(selector="protein").representation(type="cartoon").color(color="white").color_from_uri(
-        schema="all_atomic",
-        uri="http://0.0.0.0:9000/api/v1/examples/data/1cbs/json/rainbow",
-        format="json",
-    )
-    structure.component(selector="ligand").representation(type="ball_and_stick").color_from_uri(
-        schema="all_atomic",
-        uri="http://0.0.0.0:9000/api/v1/examples/data/1cbs/json/rainbow",
-        format="json",
-    )
-    return PlainTextResponse(builder.get_state())
+    cfu = dict(schema="all_atomic", uri=_url_for_json_annotation("1cbs", "rainbow"), format="json")
+    structure.component(selector="protein").representation(type="cartoon").color(color="white").color_from_uri(**cfu)
+    structure.component(selector="ligand").representation(type="ball_and_stick").color_from_uri(**cfu)
+    return builder
 
 
 @router.get("/testing/color_cif")
-async def testing_color_cif_example() -> MVSResponse:
+async def testing_color_cif_example(request: Request) -> MVSResponse:
     """
     An example with CIF-encoded coloring.
     """
+    return _cached_response(_testing_color_cif_example(), request)
+
+
+@_precomputed
+def _testing_color_cif_example() -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif("1cbs")
     annotation_url = "http://0.0.0.0:9000/api/v1/examples/data/file/1cbs/custom.cif"
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
-    structure.component(selector="polymer").representation(type="cartoon").color(color="white").color_from_uri(
-        schema="atom",
-        uri=annotation_url,
-        format="cif",
-    )
+    cfu = dict(schema="atom", uri=annotation_url, format="cif")
+    structure.component(selector="polymer").representation(type="cartoon").color(color="white").color_from_uri(**cfu)
     structure.component(selector="ligand").representation(type="ball_and_stick").color(color="white").color_from_uri(
-        schema="atom",
-        uri=annotation_url,
-        format="cif",
+        **cfu
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/color_multicategory_cif")
-async def testing_color_cif_multicategory_example() -> MVSResponse:
+async def testing_color_cif_multicategory_example(request: Request) -> MVSResponse:
     """
     An example with CIF-encoded coloring.
     """
+    return _cached_response(_testing_color_cif_multicategory_example(), request)
+
+
+@_precomputed
+def _testing_color_cif_multicategory_example() -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif("1cbs")
     annotation_url = "http://0.0.0.0:9000/api/v1/examples/data/file/1cbs/custom-multicategory.cif"
@@ -589,52 +998,62 @@ async def testing_color_cif_multicategory_example() -> MVSResponse:
         block_header="block2",
         category_name="black_is_good",
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/color_bcif")
-async def testing_color_bcif_example() -> MVSResponse:
+async def testing_color_bcif_example(request: Request) -> MVSResponse:
     """
     An example with BCIF-encoded coloring.
     """
+    return _cached_response(_testing_color_bcif_example(), request)
+
+
+@_precomputed
+def _testing_color_bcif_example() -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif("1cbs")
     annotation_url = "http://0.0.0.0:9000/api/v1/examples/data/file/1cbs/custom.bcif"
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
-    structure.component(selector="polymer").representation(type="cartoon").color(color="white").color_from_uri(
-        schema="atom",
-        uri=annotation_url,
-        format="bcif",
-    )
+    cfu = dict(schema="atom", uri=annotation_url, format="bcif")
+    structure.component(selector="polymer").representation(type="cartoon").color(color="white").color_from_uri(**cfu)
     structure.component(selector="ligand").representation(type="ball_and_stick").color(color="white").color_from_uri(
-        schema="atom",
-        uri=annotation_url,
-        format="bcif",
+        **cfu
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/color_small")
-async def testing_color_small_example() -> MVSResponse:
+async def testing_color_small_example(request: Request) -> MVSResponse:
     """
     An example with a small structure coloring applied down to atom level.
     """
+    return _cached_response(_testing_color_small_example(), request)
+
+
+@_precomputed
+def _testing_color_small_example() -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif("2bvk")
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
     structure.component(selector="all").representation(type="ball_and_stick").color(color="white").color_from_uri(
         schema="all_atomic",
-        uri="http://0.0.0.0:9000/api/v1/examples/data/2bvk/json/atoms",
+        uri=_url_for_json_annotation("2bvk", "atoms"),
         format="json",
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/color_domains")
-async def testing_color_domains_example(colors: bool = True, tooltips: bool = False) -> MVSResponse:
+async def testing_color_domains_example(request: Request, colors: bool = True, tooltips: bool = False) -> MVSResponse:
     """
     An example with different representations and coloring for polymer and non-polymer chains.
     """
+    return _cached_response(_testing_color_domains_example(colors, tooltips), request)
+
+
+@_memoized
+def _testing_color_domains_example(colors: bool, tooltips: bool) -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif("1h9t")
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
@@ -647,34 +1066,39 @@ async def testing_color_domains_example(colors: bool = True, tooltips: bool = Fa
         for repr in reprs:
             repr.color_from_uri(
                 schema="all_atomic",
-                uri="http://0.0.0.0:9000/api/v1/examples/data/1h9t/json/domains",
+                uri=_url_for_json_annotation("1h9t", "domains"),
                 format="json",
             )
     if tooltips:
         structure.tooltip_from_uri(
             schema="all_atomic",
-            uri="http://0.0.0.0:9000/api/v1/examples/data/1h9t/json/domains",
+            uri=_url_for_json_annotation("1h9t", "domains"),
             format="json",
         )
         structure.tooltip_from_uri(
             schema="all_atomic",
-            uri="http://0.0.0.0:9000/api/v1/examples/data/1h9t/json/domains",
+            uri=_url_for_json_annotation("1h9t", "domains"),
             format="json",
             field_name="label_asym_id",
         )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/color_validation")
 async def testing_color_validation_example(
-    id: str = "1tqn", tooltips: bool = False, labels: bool = False
+    request: Request, id: str = "1tqn", tooltips: bool = False, labels: bool = False
 ) -> MVSResponse:
     """
     An example with different representations and coloring for polymer and non-polymer chains.
     """
+    return _cached_response(_testing_color_validation_example(id, tooltips, labels), request)
+
+
+@_memoized
+def _testing_color_validation_example(id: str, tooltips: bool, labels: bool) -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif(id)
-    annotation_url = f"http://0.0.0.0:9000/api/v1/examples/data/{id}/json/validation"
+    annotation_url = _url_for_json_annotation(id, "validation")
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
     structure.component(selector="protein").representation(type="cartoon").color(color="#00ff00").color_from_uri(
         schema="residue",
@@ -700,14 +1124,19 @@ async def testing_color_validation_example(
             format="json",
             field_name="tooltip",
         )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/color_multilayer")
-async def testing_color_multilayer_example(id: str = "1tqn") -> MVSResponse:
+async def testing_color_multilayer_example(request: Request, id: str = "1tqn") -> MVSResponse:
     """
     An example with different representations and coloring for polymer and non-polymer chains.
     """
+    return _cached_response(_testing_color_multilayer_example(id), request)
+
+
+@_memoized
+def _testing_color_multilayer_example(id: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif(id)
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
@@ -717,48 +1146,53 @@ async def testing_color_multilayer_example(id: str = "1tqn") -> MVSResponse:
         .color(
             color="#00dd00",
             selector=[
-                ComponentExpression(beg_label_seq_id=1, end_label_seq_id=176),
-                ComponentExpression(beg_label_seq_id=242),
+                _expr(beg_label_seq_id=1, end_label_seq_id=176),
+                _expr(beg_label_seq_id=242),
             ],
         )
         .color_from_uri(
             schema="residue",
-            uri=f"http://0.0.0.0:9000/api/v1/examples/data/{id}/json/validation",
+            uri=_url_for_json_annotation(id, "validation"),
             format="json",
         )
         .color(
             color="magenta",
             selector=[
-                ComponentExpression(beg_label_seq_id=50, end_label_seq_id=63),
-                ComponentExpression(beg_auth_seq_id=373, end_auth_seq_id=376),
-                ComponentExpression(beg_auth_seq_id=393, end_auth_seq_id=396),
+                _expr(beg_label_seq_id=50, end_label_seq_id=63),
+                _expr(beg_auth_seq_id=373, end_auth_seq_id=376),
+                _expr(beg_auth_seq_id=393, end_auth_seq_id=396),
             ],
         )
-        .color(color="blue", selector=ComponentExpression(label_seq_id=52))
-        .color(color="blue", selector=ComponentExpression(label_seq_id=61))
-        .color(color="blue", selector=ComponentExpression(label_seq_id=354))
-        .color(color="blue", selector=ComponentExpression(label_seq_id=373))
+        .color(color="blue", selector=_expr(label_seq_id=52))
+        .color(color="blue", selector=_expr(label_seq_id=61))
+        .color(color="blue", selector=_expr(label_seq_id=354))
+        .color(color="blue", selector=_expr(label_seq_id=373))
     )
     (
         structure.component(selector="ligand")
         .representation(type="ball_and_stick")
         .color(color="gray")
-        .color(color="blue", selector=[ComponentExpression(type_symbol="N")])
-        .color(color="red", selector=[ComponentExpression(type_symbol="O")])
-        .color(color="yellow", selector=[ComponentExpression(type_symbol="S")])
-        .color(color="#AA0022", selector=[ComponentExpression(type_symbol="FE")])
+        .color(color="blue", selector=[_expr(type_symbol="N")])
+        .color(color="red", selector=[_expr(type_symbol="O")])
+        .color(color="yellow", selector=[_expr(type_symbol="S")])
+        .color(color="#AA0022", selector=[_expr(type_symbol="FE")])
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/component_from_uri")
-async def testing_component_from_uri(id: str = "1h9t") -> MVSResponse:
+async def testing_component_from_uri(request: Request, id: str = "1h9t") -> MVSResponse:
     """
     An example with component_from_uri.
     """
+    return _cached_response(_testing_component_from_uri(id), request)
+
+
+@_memoized
+def _testing_component_from_uri(id: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif(id)
-    annotation_url = f"http://0.0.0.0:9000/api/v1/examples/data/{id}/json/domains"
+    annotation_url = _url_for_json_annotation(id, "domains")
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
     structure.component_from_uri(
         uri=annotation_url,
@@ -771,10 +1205,10 @@ async def testing_component_from_uri(id: str = "1h9t") -> MVSResponse:
         schema="all_atomic",
         field_name="tooltip",
         field_values=["Ligand binding site"],
-    ).representation(type="ball_and_stick").color(selector=ComponentExpression(type_symbol="O"), color="red").color(
-        selector=ComponentExpression(type_symbol="N"), color="blue"
+    ).representation(type="ball_and_stick").color(selector=_expr(type_symbol="O"), color="red").color(
+        selector=_expr(type_symbol="N"), color="blue"
     ).color(
-        selector=ComponentExpression(type_symbol="S"), color="yellow"
+        selector=_expr(type_symbol="S"), color="yellow"
     )
     structure.component_from_uri(
         uri=annotation_url,
@@ -797,14 +1231,19 @@ async def testing_component_from_uri(id: str = "1h9t") -> MVSResponse:
         field_name="tooltip",
         field_values="Gold",
     ).representation(type="surface").color(color="orange")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/component_from_source")
-async def testing_component_from_source(id: str = "1h9t") -> MVSResponse:
+async def testing_component_from_source(request: Request, id: str = "1h9t") -> MVSResponse:
     """
     An example with component_from_source.
     """
+    return _cached_response(_testing_component_from_source(id), request)
+
+
+@_memoized
+def _testing_component_from_source(id: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif(id)
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
@@ -836,14 +1275,19 @@ async def testing_component_from_source(id: str = "1h9t") -> MVSResponse:
         field_name="label_entity_id",
         field_values=["5"],
     ).representation(type="surface").color(color="green")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/focus")
-async def testing_focus_example() -> MVSResponse:
+async def testing_focus_example(request: Request) -> MVSResponse:
     """
     An example for "focus" node.
     """
+    return _cached_response(_testing_focus_example(), request)
+
+
+@_precomputed
+def _testing_focus_example() -> Root:
     builder = create_builder()
     position, direction, radius = _target_spherical_to_pdr((17, 21, 27), phi=-30, theta=15, radius=100)
     up = (0.2, 1, 0)
@@ -854,14 +1298,19 @@ async def testing_focus_example() -> MVSResponse:
         type="ball_and_stick"
     ).color(color="green")
     builder.canvas(background_color="#BBDDFF")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/camera")
-async def testing_camera_example() -> MVSResponse:
+async def testing_camera_example(request: Request) -> MVSResponse:
     """
     An example for "camera" node.
     """
+    return _cached_response(_testing_camera_example(), request)
+
+
+@_precomputed
+def _testing_camera_example() -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif("1cbs")
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
@@ -870,128 +1319,134 @@ async def testing_camera_example() -> MVSResponse:
     target, position, up = _target_spherical_to_tpu((17, 21, 27), phi=30, theta=15, radius=100)
     builder.camera(target=target, position=position, up=up)
     builder.canvas(background_color="black")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
-def _target_spherical_to_pdr(target: tuple[float, float, float], phi: float = 0, theta: float = 0, radius: float = 100):
-    x, y, z = target
+def _spherical_to_position_direction(
+    x: float, y: float, z: float, phi: float, theta: float, radius: float
+) -> tuple[tuple[float, float, float], tuple[float, float, float]]:
     phi, theta = math.radians(phi), math.radians(theta)
-    direction = (-math.sin(phi) * math.cos(theta), -math.sin(theta), -math.cos(phi) * math.cos(theta))
+    sin_phi, cos_phi, sin_theta, cos_theta = math.sin(phi), math.cos(phi), math.sin(theta), math.cos(theta)
+    direction = (-sin_phi * cos_theta, -sin_theta, -cos_phi * cos_theta)
     position = (x - direction[0] * radius, y - direction[1] * radius, z - direction[2] * radius)
+    return position, direction
+
+
+@lru_cache(maxsize=256)
+def _target_spherical_to_pdr(target: tuple[float, float, float], phi: float = 0, theta: float = 0, radius: float = 100):
+    x, y, z = target
+    position, direction = _spherical_to_position_direction(x, y, z, phi, theta, radius)
     return position, direction, radius
 
 
+@lru_cache(maxsize=256)
 def _target_spherical_to_tpu(target: tuple[float, float, float], phi: float = 0, theta: float = 0, radius: float = 100):
     x, y, z = target
-    phi, theta = math.radians(phi), math.radians(theta)
-    direction = (-math.sin(phi) * math.cos(theta), -math.sin(theta), -math.cos(phi) * math.cos(theta))
-    position = (x - direction[0] * radius, y - direction[1] * radius, z - direction[2] * radius)
+    position, direction = _spherical_to_position_direction(x, y, z, phi, theta, radius)
     up = (0, 1, 0)
     return target, position, up
 
 
+_TESTING_LABELS = (
+    (ComponentExpression(label_asym_id="A", beg_label_seq_id=9, end_label_seq_id=83), "DNA-binding"),
+    (ComponentExpression(label_asym_id="B", beg_label_seq_id=9, end_label_seq_id=83), "DNA-binding"),
+    (ComponentExpression(label_asym_id="A", beg_label_seq_id=84, end_label_seq_id=231), "Acyl-CoA\nbinding"),
+    (ComponentExpression(label_asym_id="B", beg_label_seq_id=84, end_label_seq_id=231), "Acyl-CoA binding"),
+    (ComponentExpression(label_asym_id="C"), "DNA X"),
+    (ComponentExpression(label_asym_id="D"), "DNA Y"),
+    (ComponentExpression(label_asym_id="D", atom_id=4016), "DNA Y O5'"),
+    (ComponentExpression(label_asym_id="D", atom_id=4391), "DNA Y O3'"),
+    (ComponentExpression(label_asym_id="E"), "Gold"),
+    (ComponentExpression(label_asym_id="H"), "Gold"),
+    (ComponentExpression(label_asym_id="F"), "Chloride"),
+    (ComponentExpression(label_asym_id="G"), "Chloride"),
+    (ComponentExpression(label_asym_id="I"), "Chloride"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=57), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=67), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=121), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=125), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=129), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=178), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", beg_label_seq_id=203, end_label_seq_id=205), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", label_seq_id=67), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", label_seq_id=121), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", label_seq_id=125), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", label_seq_id=129), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", label_seq_id=178), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", beg_label_seq_id=203, end_label_seq_id=205), "Ligand binding"),
+)
+"""Labels shown by `testing_labels_example`, selectors are immutable and can be shared by all requests"""
+
+
 @router.get("/testing/labels")
-async def testing_labels_example(id="1h9t") -> MVSResponse:
+async def testing_labels_example(request: Request, id="1h9t") -> MVSResponse:
     """
     An example with different labels for polymer and non-polymer chains.
     """
+    return _cached_response(_testing_labels_example(id), request)
+
+
+@_memoized
+def _testing_labels_example(id: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif(id)
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
-    structure.component(selector="protein").representation(type="cartoon").color(color="white").color_from_uri(
-        schema="all_atomic",
-        uri="http://0.0.0.0:9000/api/v1/examples/data/1h9t/json/domains",
-        format="json",
-    )
+    cfu = dict(schema="all_atomic", uri=_url_for_json_annotation("1h9t", "domains"), format="json")
+    structure.component(selector="protein").representation(type="cartoon").color(color="white").color_from_uri(**cfu)
     structure.component(selector="nucleic").representation(type="ball_and_stick").color(color="white").color_from_uri(
-        schema="all_atomic",
-        uri="http://0.0.0.0:9000/api/v1/examples/data/1h9t/json/domains",
-        format="json",
-    )
-    structure.component(selector="ion").representation(type="surface").color_from_uri(
-        schema="all_atomic",
-        uri="http://0.0.0.0:9000/api/v1/examples/data/1h9t/json/domains",
-        format="json",
-    )
-    structure.component(selector=ComponentExpression(label_asym_id="A", beg_label_seq_id=9, end_label_seq_id=83)).label(
-        text="DNA-binding"
-    )
-    structure.component(selector=ComponentExpression(label_asym_id="B", beg_label_seq_id=9, end_label_seq_id=83)).label(
-        text="DNA-binding"
-    )
-    structure.component(
-        selector=ComponentExpression(label_asym_id="A", beg_label_seq_id=84, end_label_seq_id=231)
-    ).label(text="Acyl-CoA\nbinding")
-    structure.component(
-        selector=ComponentExpression(label_asym_id="B", beg_label_seq_id=84, end_label_seq_id=231)
-    ).label(text="Acyl-CoA binding")
-    structure.component(selector=ComponentExpression(label_asym_id="C")).label(text="DNA X")
-    structure.component(selector=ComponentExpression(label_asym_id="D")).label(text="DNA Y")
-
-    structure.component(selector=ComponentExpression(label_asym_id="D", atom_id=4016)).label(text="DNA Y O5'")
-    structure.component(selector=ComponentExpression(label_asym_id="D", atom_id=4391)).label(text="DNA Y O3'")
-    structure.component(selector=ComponentExpression(label_asym_id="E")).label(text="Gold")
-    structure.component(selector=ComponentExpression(label_asym_id="H")).label(text="Gold")
-    structure.component(selector=ComponentExpression(label_asym_id="F")).label(text="Chloride")
-    structure.component(selector=ComponentExpression(label_asym_id="G")).label(text="Chloride")
-    structure.component(selector=ComponentExpression(label_asym_id="I")).label(text="Chloride")
-
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=57)).label(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=67)).label(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=121)).label(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=125)).label(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=129)).label(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=178)).label(text="Ligand binding")
-    structure.component(
-        selector=ComponentExpression(label_asym_id="A", beg_label_seq_id=203, end_label_seq_id=205)
-    ).label(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="B", label_seq_id=67)).label(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="B", label_seq_id=121)).label(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="B", label_seq_id=125)).label(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="B", label_seq_id=129)).label(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="B", label_seq_id=178)).label(text="Ligand binding")
-    structure.component(
-        selector=ComponentExpression(label_asym_id="B", beg_label_seq_id=203, end_label_seq_id=205)
-    ).label(text="Ligand binding")
-    return PlainTextResponse(builder.get_state())
+        **cfu
+    )
+    structure.component(selector="ion").representation(type="surface").color_from_uri(**cfu)
+    structure.labels(entries=_TESTING_LABELS)
+    return builder
+
+
+_TESTING_TOOLTIPS = (
+    (ComponentExpression(label_asym_id="A", beg_label_seq_id=9, end_label_seq_id=83), "DNA-binding"),
+    (ComponentExpression(label_asym_id="B", beg_label_seq_id=9, end_label_seq_id=83), "DNA-binding"),
+    (ComponentExpression(label_asym_id="A", beg_label_seq_id=84, end_label_seq_id=231), "Acyl-CoA\nbinding"),
+    (ComponentExpression(label_asym_id="B", beg_label_seq_id=84, end_label_seq_id=231), "Acyl-CoA binding"),
+)
+_TESTING_ATOM_TOOLTIPS = (
+    (ComponentExpression(label_asym_id="D", atom_id=4016), "DNA Y O5'"),
+    (ComponentExpression(label_asym_id="D", atom_id=4391), "DNA Y O3'"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=57), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=67), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=121), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=125), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=129), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", label_seq_id=178), "Ligand binding"),
+    (ComponentExpression(label_asym_id="A", beg_label_seq_id=203, end_label_seq_id=205), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", label_seq_id=67), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", label_seq_id=121), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", label_seq_id=125), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", label_seq_id=129), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", label_seq_id=178), "Ligand binding"),
+    (ComponentExpression(label_asym_id="B", beg_label_seq_id=203, end_label_seq_id=205), "Ligand binding"),
+)
 
 
 @router.get("/testing/tooltips")
-async def testing_tooltips_example(id="1h9t") -> MVSResponse:
+async def testing_tooltips_example(request: Request, id="1h9t") -> MVSResponse:
     """
     An example with different labels for polymer and non-polymer chains.
     """
+    return _cached_response(_testing_tooltips_example(id), request)
+
+
+@_memoized
+def _testing_tooltips_example(id: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif(id)
-    annotation_url = f"http://0.0.0.0:9000/api/v1/examples/data/{id}/json/domains"
+    annotation_url = _url_for_json_annotation(id, "domains")
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
-    structure.component(selector="protein").representation(type="cartoon").color(color="white").color_from_uri(
-        schema="all_atomic",
-        uri=annotation_url,
-        format="json",
-    )
+    cfu = dict(schema="all_atomic", uri=annotation_url, format="json")
+    structure.component(selector="protein").representation(type="cartoon").color(color="white").color_from_uri(**cfu)
     structure.component(selector="nucleic").representation(type="ball_and_stick").color(color="white").color_from_uri(
-        schema="all_atomic",
-        uri=annotation_url,
-        format="json",
-    )
-    structure.component(selector="ion").representation(type="surface").color_from_uri(
-        schema="all_atomic",
-        uri=annotation_url,
-        format="json",
+        **cfu
     )
-    structure.component(
-        selector=ComponentExpression(label_asym_id="A", beg_label_seq_id=9, end_label_seq_id=83)
-    ).tooltip(text="DNA-binding")
-    structure.component(
-        selector=ComponentExpression(label_asym_id="B", beg_label_seq_id=9, end_label_seq_id=83)
-    ).tooltip(text="DNA-binding")
-    structure.component(
-        selector=ComponentExpression(label_asym_id="A", beg_label_seq_id=84, end_label_seq_id=231)
-    ).tooltip(text="Acyl-CoA\nbinding")
-    structure.component(
-        selector=ComponentExpression(label_asym_id="B", beg_label_seq_id=84, end_label_seq_id=231)
-    ).tooltip(text="Acyl-CoA binding")
+    structure.component(selector="ion").representation(type="surface").color_from_uri(**cfu)
+    structure.tooltips(entries=_TESTING_TOOLTIPS)
 
     structure.component_from_uri(
         uri=annotation_url,
@@ -1021,81 +1476,45 @@ async def testing_tooltips_example(id="1h9t") -> MVSResponse:
         field_values="AU",
     ).tooltip(text="Gold (this component comes from CIF)")
 
-    structure.component(selector=ComponentExpression(label_asym_id="D", atom_id=4016)).tooltip(text="DNA Y O5'")
-    structure.component(selector=ComponentExpression(label_asym_id="D", atom_id=4391)).tooltip(text="DNA Y O3'")
-
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=57)).tooltip(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=67)).tooltip(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=121)).tooltip(
-        text="Ligand binding"
-    )
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=125)).tooltip(
-        text="Ligand binding"
-    )
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=129)).tooltip(
-        text="Ligand binding"
-    )
-    structure.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=178)).tooltip(
-        text="Ligand binding"
-    )
-    structure.component(
-        selector=ComponentExpression(label_asym_id="A", beg_label_seq_id=203, end_label_seq_id=205)
-    ).tooltip(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="B", label_seq_id=67)).tooltip(text="Ligand binding")
-    structure.component(selector=ComponentExpression(label_asym_id="B", label_seq_id=121)).tooltip(
-        text="Ligand binding"
-    )
-    structure.component(selector=ComponentExpression(label_asym_id="B", label_seq_id=125)).tooltip(
-        text="Ligand binding"
-    )
-    structure.component(selector=ComponentExpression(label_asym_id="B", label_seq_id=129)).tooltip(
-        text="Ligand binding"
-    )
-    structure.component(selector=ComponentExpression(label_asym_id="B", label_seq_id=178)).tooltip(
-        text="Ligand binding"
-    )
-    structure.component(
-        selector=ComponentExpression(label_asym_id="B", beg_label_seq_id=203, end_label_seq_id=205)
-    ).tooltip(text="Ligand binding")
-    return PlainTextResponse(builder.get_state())
+    structure.tooltips(entries=_TESTING_ATOM_TOOLTIPS)
+    return builder
 
 
 @router.get("/testing/labels_from_uri")
-async def testing_labels_from_uri_example(id="1h9t", annotation_name="domains") -> MVSResponse:
+async def testing_labels_from_uri_example(request: Request, id="1h9t", annotation_name="domains") -> MVSResponse:
     """
     An example with different labels for polymer and non-polymer chains.
     """
+    return _cached_response(_testing_labels_from_uri_example(id, annotation_name), request)
+
+
+@_memoized
+def _testing_labels_from_uri_example(id: str, annotation_name: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_local_bcif(id)
-    annotation_url = f"http://0.0.0.0:9000/api/v1/examples/data/1h9t/json/{annotation_name}"
+    annotation_url = _url_for_json_annotation("1h9t", annotation_name)
     structure = builder.download(url=structure_url).parse(format="bcif").model_structure()
+    cfu = dict(schema="all_atomic", uri=annotation_url, format="json")
     protein = structure.component(selector="protein")
-    protein.representation(type="cartoon").color(color="white").color_from_uri(
-        schema="all_atomic",
-        uri=annotation_url,
-        format="json",
-    )
+    protein.representation(type="cartoon").color(color="white").color_from_uri(**cfu)
     nucleic = structure.component(selector="nucleic")
-    nucleic.representation(type="ball_and_stick").color(color="white").color_from_uri(
-        schema="all_atomic",
-        uri=annotation_url,
-        format="json",
-    )
+    nucleic.representation(type="ball_and_stick").color(color="white").color_from_uri(**cfu)
     ion = structure.component(selector="ion")
-    ion.representation(type="surface").color_from_uri(
-        schema="all_atomic",
-        uri=annotation_url,
-        format="json",
-    )
+    ion.representation(type="surface").color_from_uri(**cfu)
     structure.label_from_uri(uri=annotation_url, format="json", schema="all_atomic", field_name="tooltip")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/testing/labels_from_source")
-async def testing_labels_from_source_example() -> MVSResponse:
+async def testing_labels_from_source_example(request: Request) -> MVSResponse:
     """
     Labels from the same CIF as structure
     """
+    return _cached_response(_testing_labels_from_source_example(), request)
+
+
+@_precomputed
+def _testing_labels_from_source_example() -> Root:
     builder = create_builder()
     structure_url = f"http://0.0.0.0:9000/api/v1/examples/data/1cbs/molecule-and-cif-annotations"
     structure = builder.download(url=structure_url).parse(format="mmcif").model_structure()
@@ -1109,7 +1528,7 @@ async def testing_labels_from_source_example() -> MVSResponse:
     structure.label_from_source(
         schema="all_atomic", category_name="mvs_test_chain_label_annotation", field_name="tooltip"
     )
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 ##############################################################################
@@ -1151,12 +1570,17 @@ BASE_COLOR = "#CCCCCC"  # should be #787878 but that's too dark because of missi
 
 @router.get("/portfolio/entry")
 async def portfolio_entry_or_assembly(
-    coloring: Literal["by_chain", "by_entity"] = "by_chain", assembly_id: Union[str, None] = None
+    request: Request, coloring: Literal["by_chain", "by_entity"] = "by_chain", assembly_id: Union[str, None] = None
 ) -> MVSResponse:
     """
     Entry or assembly structure colored by chain, as created by PDBImages.
     (We are missing coloring by symmetry operator for assemblies!)
     """
+    return _cached_response(_portfolio_entry_or_assembly(coloring, assembly_id), request)
+
+
+@_memoized
+def _portfolio_entry_or_assembly(coloring: Literal["by_chain", "by_entity"], assembly_id: Union[str, None]) -> Root:
     ID = "1hda"
     builder = create_builder()
     structure_url = _url_for_mmcif(ID)
@@ -1170,36 +1594,46 @@ async def portfolio_entry_or_assembly(
         uri=annotation_url, format="cif", schema="all_atomic", category_name=f"color_{coloring}"
     ).color_from_uri(uri=annotation_url, format="cif", schema="all_atomic", category_name="color_by_symbol")
     builder.camera(**CAMERA_FOR_1HDA)
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/entity")
-async def portfolio_entity(entity_id: str = "1", assembly_id: str = "1") -> MVSResponse:
+async def portfolio_entity(request: Request, entity_id: str = "1", assembly_id: str = "1") -> MVSResponse:
     """
     Assembly structure with a higlighted entity, as created by PDBImages.
     (We are missing advanced styling, like size-factor and opacity!)
     """
+    return _cached_response(_portfolio_entity(entity_id, assembly_id), request)
+
+
+@_memoized
+def _portfolio_entity(entity_id: str, assembly_id: str) -> Root:
     ID = "1hda"
     builder = create_builder()
     structure_url = _url_for_mmcif(ID)
     struct = builder.download(url=structure_url).parse(format="mmcif").assembly_structure(assembly_id=assembly_id)
     highlight = ENTITY_COLORS_1HDA.get(entity_id, "black")
     struct.component(selector="polymer").representation(type="cartoon").color(color=BASE_COLOR).color(
-        selector=ComponentExpression(label_entity_id=entity_id), color=highlight
+        selector=_expr(label_entity_id=entity_id), color=highlight
     )
     struct.component(selector="ligand").representation(type="ball_and_stick").color(color=BASE_COLOR).color(
-        selector=ComponentExpression(label_entity_id=entity_id), color=highlight
+        selector=_expr(label_entity_id=entity_id), color=highlight
     )
     builder.camera(**CAMERA_FOR_1HDA)
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/domain")
-async def portfolio_domain() -> MVSResponse:
+async def portfolio_domain(request: Request) -> MVSResponse:
     """
     Chain structure with a higlighted SIFTS domain, as created by PDBImages.
     (We are missing advanced styling, like size-factor and opacity!)
     """
+    return _cached_response(_portfolio_domain(), request)
+
+
+@_precomputed
+def _portfolio_domain() -> Root:
     ID = "1hda"
     DOMAIN = "Pfam_PF00042_A"
     builder = create_builder()
@@ -1228,15 +1662,20 @@ async def portfolio_domain() -> MVSResponse:
     ligand.representation(type="ball_and_stick").color(color=BASE_COLOR)
     struct.tooltip_from_uri(uri=annotation_url, format="cif", category_name=f"sifts_{DOMAIN}", schema="all_atomic")
     builder.camera(**CAMERA_FOR_1HDA_A)
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/ligand")
-async def portfolio_ligand() -> MVSResponse:
+async def portfolio_ligand(request: Request) -> MVSResponse:
     """
     Ligand environment, as created by PDBImages.
     (We are missing advanced styling, like size-factor and opacity!)
     """
+    return _cached_response(_portfolio_ligand(), request)
+
+
+@_precomputed
+def _portfolio_ligand() -> Root:
     ID = "1hda"
     LIGAND = "HEM"
     builder = create_builder()
@@ -1289,14 +1728,19 @@ async def portfolio_ligand() -> MVSResponse:
     )
     struct.tooltip_from_uri(uri=annotation_url, format="cif", category_name=f"ligand_{LIGAND}", schema="all_atomic")
     builder.camera(**CAMERA_FOR_1HDA_HEM)
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/validation")
-async def portfolio_validation() -> MVSResponse:
+async def portfolio_validation(request: Request) -> MVSResponse:
     """
     Entry structure colored by validation report issues, as created by PDBImages.
     """
+    return _cached_response(_portfolio_validation(), request)
+
+
+@_precomputed
+def _portfolio_validation() -> Root:
     ID = "1hda"
     builder = create_builder()
     structure_url = _url_for_mmcif(ID)
@@ -1310,15 +1754,20 @@ async def portfolio_validation() -> MVSResponse:
     )
     struct.tooltip_from_uri(uri=annotation_url, format="json", schema="all_atomic")
     builder.camera(**CAMERA_FOR_1HDA)
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/modres")
-async def portfolio_modres() -> MVSResponse:
+async def portfolio_modres(request: Request) -> MVSResponse:
     """
     Assembly structure with higlighted instances of a modified residue, as created by PDBImages.
     (We are missing advanced styling, like size-factor and opacity!)
     """
+    return _cached_response(_portfolio_modres(), request)
+
+
+@_precomputed
+def _portfolio_modres() -> Root:
     ID = "1gkt"
     ASSEMBLY = "1"
     builder = create_builder()
@@ -1326,19 +1775,24 @@ async def portfolio_modres() -> MVSResponse:
     struct = builder.download(url=structure_url).parse(format="mmcif").assembly_structure(assembly_id=ASSEMBLY)
     struct.component(selector="polymer").representation(type="cartoon").color(color=BASE_COLOR)
     struct.component(selector="ligand").representation(type="ball_and_stick").color(color=BASE_COLOR)
-    struct.component(selector=ComponentExpression(label_asym_id="A", label_seq_id=54)).tooltip(
+    struct.component(selector=_expr(label_asym_id="A", label_seq_id=54)).tooltip(
         text="Modified residue SUI: (3-amino-2,5-dioxo-1-pyrrolidinyl)acetic acid"
     ).representation(type="ball_and_stick").color(color="#ED645A")
     builder.camera(**CAMERA_FOR_1GKT)
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/bfactor")
-async def portfolio_bfactor() -> MVSResponse:
+async def portfolio_bfactor(request: Request) -> MVSResponse:
     """
     Entry structure colored by B-factor, as created by PDBImages.
     (We are missing putty representation and size theme!)
     """
+    return _cached_response(_portfolio_bfactor(), request)
+
+
+@_precomputed
+def _portfolio_bfactor() -> Root:
     ID = "1tqn"
     builder = create_builder()
     structure_url = _url_for_mmcif(ID)
@@ -1358,14 +1812,19 @@ async def portfolio_bfactor() -> MVSResponse:
         uri=annotation_url, format="cif", schema="all_atomic", category_name=f"bfactor", field_name="B_iso_or_equiv"
     )
     builder.camera(**(CAMERA_FOR_1TQN if ID == "1tqn" else CAMERA_FOR_1HDA))
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/plddt")
-async def portfolio_plddt() -> MVSResponse:
+async def portfolio_plddt(request: Request) -> MVSResponse:
     """
     AlphaFold predicted structure colored by pLDDT, as created by PDBImages.
     """
+    return _cached_response(_portfolio_plddt(), request)
+
+
+@_precomputed
+def _portfolio_plddt() -> Root:
     ID = "AF-Q5VSL9-F1-model_v4"
     builder = create_builder()
     structure_url = f"https://alphafold.ebi.ac.uk/files/{ID}.cif"
@@ -1379,14 +1838,19 @@ async def portfolio_plddt() -> MVSResponse:
         uri=annotation_url, format="cif", schema="all_atomic", category_name=f"plddt", field_name="plddt"
     )
     builder.camera(**CAMERA_FOR_Q5VSL9)
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/pdbe_entry_page")
-async def portfolio_pdbe_entry_page(id: str = "7xv8") -> MVSResponse:
+async def portfolio_pdbe_entry_page(request: Request, id: str = "7xv8") -> MVSResponse:
     """
     "PDBe entry page 3D view" from https://docs.google.com/spreadsheets/d/1sUSWmBLfKMmPLW2yqVnxWQTQoVk6SmQppdCfItyO1m0/edit#gid=0
     """
+    return _cached_response(_portfolio_pdbe_entry_page(id), request)
+
+
+@_memoized
+def _portfolio_pdbe_entry_page(id: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_mmcif(id)
     struct = builder.download(url=structure_url).parse(format="mmcif").model_structure()
@@ -1406,64 +1870,79 @@ async def portfolio_pdbe_entry_page(id: str = "7xv8") -> MVSResponse:
         color="#98170f"
     )
     builder.canvas(background_color="#000000")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/pdbe_entry_page_entity")
-async def portfolio_pdbe_entry_page_entity(id: str = "7xv8", entity_id: str = "1") -> MVSResponse:
+async def portfolio_pdbe_entry_page_entity(request: Request, id: str = "7xv8", entity_id: str = "1") -> MVSResponse:
     """
     "PDBe entry page entity view" from https://docs.google.com/spreadsheets/d/1sUSWmBLfKMmPLW2yqVnxWQTQoVk6SmQppdCfItyO1m0/edit#gid=0
     """
+    return _cached_response(_portfolio_pdbe_entry_page_entity(id, entity_id), request)
+
+
+@_memoized
+def _portfolio_pdbe_entry_page_entity(id: str, entity_id: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_mmcif(id)
     struct = builder.download(url=structure_url).parse(format="mmcif").model_structure()
     struct.component(selector="polymer").representation(type="cartoon").color(color="#dfc2c1").color(
-        selector=ComponentExpression(label_entity_id=entity_id), color="#720202"
+        selector=_expr(label_entity_id=entity_id), color="#720202"
     )
     struct.component(selector="ligand").representation(type="ball_and_stick").color(color="#dfc2c1")
     struct.component(selector="ion").representation(type="ball_and_stick").color(color="#dfc2c1")
     struct.component(selector="branched").representation(type="ball_and_stick").color(color="#dfc2c1")
     struct.component(selector="water").representation(type="ball_and_stick").color(color="#dfc2c1")
-    struct.component(selector=ComponentExpression(label_entity_id=entity_id)).tooltip(text=f"Entity {entity_id}")
+    struct.component(selector=_expr(label_entity_id=entity_id)).tooltip(text=f"Entity {entity_id}")
     builder.canvas(background_color="#000000")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/pdbekb_default")
-async def portfolio_pdbekb_default(id: str = "7xv8", entity_id: str = "1") -> MVSResponse:
+async def portfolio_pdbekb_default(request: Request, id: str = "7xv8", entity_id: str = "1") -> MVSResponse:
     """
     "PDBe-KB default view" from https://docs.google.com/spreadsheets/d/1sUSWmBLfKMmPLW2yqVnxWQTQoVk6SmQppdCfItyO1m0/edit#gid=0
     """
+    return _cached_response(_portfolio_pdbekb_default(id, entity_id), request)
+
+
+@_memoized
+def _portfolio_pdbekb_default(id: str, entity_id: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_mmcif(id)
     struct = builder.download(url=structure_url).parse(format="mmcif").model_structure()
     struct.component(selector="polymer").representation(type="cartoon").color(color="#dcbfbe").color(
-        selector=ComponentExpression(label_entity_id=entity_id), color="#2b6bd2"
+        selector=_expr(label_entity_id=entity_id), color="#2b6bd2"
     )
     struct.component(selector="ligand").representation(type="ball_and_stick").color(color="#dcbfbe")
     struct.component(selector="ion").representation(type="ball_and_stick").color(color="#dcbfbe")
     struct.component(selector="branched").representation(type="ball_and_stick").color(color="#dcbfbe")
     struct.component(selector="water").representation(type="ball_and_stick").color(color="#dcbfbe")
-    struct.component(selector=ComponentExpression(label_entity_id=entity_id)).tooltip(text=f"Entity {entity_id}")
+    struct.component(selector=_expr(label_entity_id=entity_id)).tooltip(text=f"Entity {entity_id}")
     builder.canvas(background_color="#ffffff")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/pdbekb_segment_superpose")
 async def portfolio_pdbekb_segment_superpose(
-    id1: str = "1tqn", chain1: str = "A", id2: str = "2nnj", chain2: str = "A"
+    request: Request, id1: str = "1tqn", chain1: str = "A", id2: str = "2nnj", chain2: str = "A"
 ) -> MVSResponse:
     """
     "PDBe-KB segment superpose view" from https://docs.google.com/spreadsheets/d/1sUSWmBLfKMmPLW2yqVnxWQTQoVk6SmQppdCfItyO1m0/edit#gid=0
     (We are missing putty representation!)
     """
+    return _cached_response(_portfolio_pdbekb_segment_superpose(id1, chain1, id2, chain2), request)
+
+
+@_memoized
+def _portfolio_pdbekb_segment_superpose(id1: str, chain1: str, id2: str, chain2: str) -> Root:
     builder = create_builder()
     structure_url1 = _url_for_mmcif(id1)  # TODO use model server, only retrieve the chain
     structure_url2 = _url_for_mmcif(id2)  # TODO use model server, only retrieve the chain
     struct1 = builder.download(url=structure_url1).parse(format="mmcif").model_structure()
     struct2 = builder.download(url=structure_url2).parse(format="mmcif").model_structure()
     (
-        struct1.component(selector=ComponentExpression(label_asym_id=chain1))
+        struct1.component(selector=_expr(label_asym_id=chain1))
         .tooltip(text=f"{id1}, chain {chain1}")
         .representation(type="cartoon")
         .color(color="#1d9873")
@@ -1487,25 +1966,30 @@ async def portfolio_pdbekb_segment_superpose(
                 -46.34873616,
             ],
         )
-        .component(selector=ComponentExpression(label_asym_id=chain2))
+        .component(selector=_expr(label_asym_id=chain2))
         .tooltip(text=f"{id2}, chain {chain2}")
         .representation(type="cartoon")  # should be putty
         .color(color="#cc5a03")
     )
     builder.canvas(background_color="#ffffff")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/pdbekb_ligand_superpose")
-async def portfolio_pdbekb_ligand_superpose(chains: str = "1tqn:A,2nnj:A") -> MVSResponse:
+async def portfolio_pdbekb_ligand_superpose(request: Request, chains: str = "1tqn:A,2nnj:A") -> MVSResponse:
     """
     "PDBe-KB ligand superpose view" from https://docs.google.com/spreadsheets/d/1sUSWmBLfKMmPLW2yqVnxWQTQoVk6SmQppdCfItyO1m0/edit#gid=0
     (We are missing putty representation!)
     """
+    return _cached_response(_portfolio_pdbekb_ligand_superpose(chains), request)
+
+
+@_memoized
+def _portfolio_pdbekb_ligand_superpose(chains: str) -> Root:
     builder = create_builder()
     for i, id_chain in enumerate(chains.split(",")):
         id, chain = id_chain.split(":")
-        print(id, chain)
+        logger.debug("superposing %s chain %s", id, chain)
         structure_url1 = _url_for_mmcif(id)  # TODO use model server, only retrieve what's needed
         struct = builder.download(url=structure_url1).parse(format="mmcif").model_structure()
         if i > 0:  # this is just an example, transform will have to be different for each structure, of course
@@ -1528,21 +2012,26 @@ async def portfolio_pdbekb_ligand_superpose(chains: str = "1tqn:A,2nnj:A") -> MV
                 ],
             )
         if i == 0:
-            struct.component(selector=ComponentExpression(label_asym_id=chain)).representation(type="cartoon").color(
+            struct.component(selector=_expr(label_asym_id=chain)).representation(type="cartoon").color(
                 color="#1d9873"
             )  # should be putty
         struct.component(selector="ligand").representation(type="ball_and_stick").color(color="#f602f7")
         struct.component(selector="ion").representation(type="ball_and_stick").color(color="#f602f7")
     builder.canvas(background_color="#ffffff")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 @router.get("/portfolio/rcsb_entry")
-async def portfolio_rcsb_entry(id: str = "3sn6") -> MVSResponse:
+async def portfolio_rcsb_entry(request: Request, id: str = "3sn6") -> MVSResponse:
     """
     "RCSB PDB entry page 3D view" from https://docs.google.com/spreadsheets/d/1QQ_P0VlURzpMhqa8rI-D2nJ8f1lfrHTpqrN0q5PbACs/edit#gid=0
     (The document says color by entity, but the image looks more like color by auth_asym_id (which is also MolStar's preset))
     """
+    return _cached_response(_portfolio_rcsb_entry(id), request)
+
+
+@_memoized
+def _portfolio_rcsb_entry(id: str) -> Root:
     builder = create_builder()
     structure_url = _url_for_mmcif(id)
     struct = builder.download(url=structure_url).parse(format="mmcif").model_structure()
@@ -1563,7 +2052,7 @@ async def portfolio_rcsb_entry(id: str = "3sn6") -> MVSResponse:
         color=SYMBOL_COLORS["O"]
     )
     builder.canvas(background_color="#ffffff")
-    return PlainTextResponse(builder.get_state())
+    return builder
 
 
 ##############################################################################
@@ -1573,40 +2062,233 @@ async def portfolio_rcsb_entry(id: str = "3sn6") -> MVSResponse:
 @router.get("/testing/local_bcif/{id}")
 async def testing_local_bcif(id: str) -> Response:
     """Return a PDB structure in BCIF cached on local server (obtain from PDBe and cache if not present)"""
-    id = id.lower()
-    result_file = settings.TEST_DATA_DIR / "tmp" / f"{id}.bcif"
-    if not result_file.exists():
-        url = _url_for_bcif(id)
-        response = requests.get(url)
-        print("status", response.status_code)
-        if not response.ok:
-            raise Exception(f"Failed to obtain {url}")
-        data = response.content
-        result_file.parent.mkdir(parents=True, exist_ok=True)
-        result_file.write_bytes(data)
+    result_file = await _ensure_local_bcif(id.lower())
+    if settings.ACCEL_REDIRECT_TMP_PREFIX is not None:
+        return Response(
+            media_type="application/octet-stream",
+            headers={"X-Accel-Redirect": settings.ACCEL_REDIRECT_TMP_PREFIX + result_file.name},
+        )
     return FileResponse(result_file, media_type="application/octet-stream")
 
 
+@router.post("/testing/local_bcif/batch")
+async def testing_local_bcif_batch(ids: list[str] = Body(embed=True)) -> Response:
+    """Make sure that BCIF files for all `ids` are cached on local server, return their local URLs"""
+    # validate all entries upfront, so that a bad id rejects the request before any download starts
+    ids = list(dict.fromkeys(_checked_entry_id(id).lower() for id in ids))
+
+    async def ensure(id: str) -> None:
+        async with _UPSTREAM_DOWNLOADS:
+            await _ensure_local_bcif(id)
+
+    await asyncio.gather(*(ensure(id) for id in ids))
+    return ORJSONResponse({id: _url_for_local_bcif(id) for id in ids})
+
+
+@router.post("/testing/prefetch", status_code=202)
+async def testing_prefetch(ids: str) -> Response:
+    """
+    Schedule BCIF files for `ids` (comma-separated) to be cached on local server, without waiting for the downloads.
+    Return the entries that were actually scheduled (i.e. not cached or already scheduled before).
+    """
+    # validate all entries upfront, so that a bad id rejects the request before anything is scheduled
+    ids_list = list(dict.fromkeys(_checked_entry_id(id.strip()).lower() for id in ids.split(",") if id.strip()))
+    if not _PREFETCH_WORKERS:
+        _PREFETCH_WORKERS.extend(asyncio.create_task(_prefetch_worker()) for _ in range(_PREFETCH_WORKER_COUNT))
+    scheduled = []
+    for id in ids_list:
+        if id in _PREFETCH_PENDING or id in _CACHED_LOCAL_BCIF or _local_bcif_file(id).exists():
+            continue
+        _PREFETCH_PENDING.add(id)
+        _PREFETCH_QUEUE.put_nowait(id)
+        scheduled.append(id)
+    return ORJSONResponse(scheduled, status_code=202)
+
+
+_PREFETCH_QUEUE: asyncio.Queue[str]
+"""Entries waiting to be downloaded by prefetch workers"""
+_PREFETCH_PENDING: set[str] = set()
+"""Entries in `_PREFETCH_QUEUE` or being downloaded by prefetch workers"""
+_PREFETCH_WORKERS: list[asyncio.Task] = []
+_PREFETCH_WORKER_COUNT = 4
+"""Number of concurrent prefetch downloads"""
+
+
+async def _prefetch_worker() -> None:
+    while True:
+        id = await _PREFETCH_QUEUE.get()
+        try:
+            await _ensure_local_bcif(id)
+        except Exception:
+            logger.warning("Failed to prefetch %s", id, exc_info=True)
+        finally:
+            _PREFETCH_PENDING.discard(id)
+            _PREFETCH_QUEUE.task_done()
+
+
+_CACHED_LOCAL_BCIF: set[str] = set()
+"""Entries known to be cached on local server, spares the `stat` call on warm cache hits (files downloaded by other
+worker processes are found on disk and added on first use)"""
+_LOCAL_BCIF_LOCKS = _KeyedLock()
+"""Makes sure that concurrent cache misses for the same entry only trigger a single download"""
+_UPSTREAM_DOWNLOADS: asyncio.Semaphore
+"""Bounds the number of concurrent upstream downloads triggered by batch requests"""
+
+
+def _local_bcif_file(id: str) -> Path:
+    """Return path where the BCIF file for `id` is cached on local server"""
+    return settings.TEST_DATA_DIR / "tmp" / f"{_checked_entry_id(id)}.bcif"
+
+
+_ENTRY_ID = re.compile(r"[0-9A-Za-z]{4}")
+_DATA_NAME = re.compile(r"[\w-]+", re.ASCII)
+
+
+def _checked_entry_id(id: str) -> str:
+    """Return `id` if it is a well-formed PDB entry id, reject it with 422 otherwise (ids end up in file paths)"""
+    if _ENTRY_ID.fullmatch(id) is None:
+        raise HTTPException(status_code=422, detail=f"Invalid PDB entry id: {id!r}")
+    return id
+
+
+def _checked_data_name(name: str) -> str:
+    """Return `name` if it can only refer to an entry directly in the test data directory, reject it with 422 otherwise"""
+    if _DATA_NAME.fullmatch(name) is None:
+        raise HTTPException(status_code=422, detail=f"Invalid data id: {name!r}")
+    return name
+
+
+async def _ensure_local_bcif(id: str) -> Path:
+    """Return path to the locally cached BCIF file for `id`, obtain it from PDBe first if not present"""
+    result_file = _local_bcif_file(id)
+    if id in _CACHED_LOCAL_BCIF:
+        return result_file
+    if result_file.exists():
+        _CACHED_LOCAL_BCIF.add(id)
+        return result_file
+    async with _LOCAL_BCIF_LOCKS(id):
+        # another request may have fetched the file while we were waiting for the lock
+        if not result_file.exists():
+            url = _url_for_bcif(id)
+            result_file.parent.mkdir(parents=True, exist_ok=True)
+            # stream into a temporary file and publish it atomically, so that nobody gets to see a partial download
+            # (named per process, as worker processes share the cache directory)
+            partial_file = result_file.with_name(f"{result_file.name}.{os.getpid()}.part")
+            try:
+                async with _UPSTREAM_REQUESTS, _HTTP_CLIENT.stream("GET", url) as response:
+                    logger.debug("GET %s: status %s", url, response.status_code)
+                    if not response.is_success:
+                        raise Exception(f"Failed to obtain {url}")
+                    async with await anyio.open_file(partial_file, "wb") as f:
+                        async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+                            await f.write(chunk)
+            except BaseException:
+                # also covers cancellation (client disconnected), don't leave truncated downloads behind
+                partial_file.unlink(missing_ok=True)
+                raise
+            os.replace(partial_file, result_file)
+        _CACHED_LOCAL_BCIF.add(id)
+    return result_file
+
+
+_MATERIALIZED_FILE_LOCKS = _KeyedLock()
+"""Makes sure that each derived file is only written by one request at a time"""
+
+
+async def _materialize(target: Path, *parts: bytes | Path) -> Path:
+    """
+    Return path to a file containing the concatenation of `parts` (literal bytes or content of files). The file is only
+    written if it does not exist yet or if any of the source files changed since.
+    """
+    sources = [part for part in parts if isinstance(part, Path)]
+
+    def is_fresh() -> bool:
+        try:
+            mtime = target.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        return all(source.stat().st_mtime_ns <= mtime for source in sources)
+
+    if is_fresh():
+        return target
+    async with _MATERIALIZED_FILE_LOCKS(str(target)):
+        if not is_fresh():
+            await anyio.to_thread.run_sync(_write_concatenated, target, parts)
+    return target
+
+
+def _write_concatenated(target: Path, parts: tuple[bytes | Path, ...]) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial_file = target.with_name(f"{target.name}.{os.getpid()}.part")
+    with partial_file.open("wb") as f:
+        for part in parts:
+            if isinstance(part, Path):
+                with part.open("rb") as source:
+                    shutil.copyfileobj(source, f, _CHUNK_SIZE)
+            else:
+                f.write(part)
+    os.replace(partial_file, target)
+
+
+def _file_response(path: Path, request: Request, media_type: str | None = None) -> Response:
+    """Serve a file with validation headers, answer with an empty 304 response if the client already holds it"""
+    stat = path.stat()
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+
+
+@lru_cache(maxsize=4096)
+def _expr(**kwargs: str | int) -> ComponentExpression:
+    """Return a shared `ComponentExpression` instance, so that selectors repeated across requests are only built and
+    validated once (instances are immutable, so sharing them is safe)"""
+    return ComponentExpression(**kwargs)
+
+
+@lru_cache(maxsize=4096)
 def _url_for_local_bcif(id: str) -> str:
     """Return URL for `testing_local_bcif` endpoint"""
     return f"http://0.0.0.0:9000/api/v1/examples/testing/local_bcif/{id.lower()}"
 
 
+@lru_cache(maxsize=4096)
+def _url_for_json_annotation(id: str, name: str) -> str:
+    """Return URL for `json_annotation` endpoint"""
+    return f"http://0.0.0.0:9000/api/v1/examples/data/{id}/json/{name}"
+
+
+@lru_cache(maxsize=4096)
 def _url_for_mmcif(id: str) -> str:
     """Return URL for updated mmCIF file from PDBe server"""
     return f"https://files.wwpdb.org/download/{id.lower()}.cif"
 
 
+@lru_cache(maxsize=4096)
 def _url_for_bcif(id: str) -> str:
     """Return URL for updated binary CIF file from PDBe server"""
     return f"https://www.ebi.ac.uk/pdbe/entry-files/download/{id.lower()}.bcif"
 
 
+@lru_cache(maxsize=4096)
 def _url_for_pdb(id: str) -> str:
     """Return URL for good old PDB file from PDBe server"""
     return f"https://files.wwpdb.org/download/{id.lower()}.pdb"
 
 
+@lru_cache(maxsize=4096)
+def _url_for_pdbe_validation_api(id: str) -> str:
+    """Return URL for residue-wise validation outlier summary from PDBe API"""
+    return f"https://www.ebi.ac.uk/pdbe/api/validation/residuewise_outlier_summary/entry/{id.lower()}"
+
+
+@lru_cache(maxsize=4096)
+def _url_for_validation_data(id: str) -> str:
+    """Return (relative) URL for `validation_data` endpoint"""
+    return f"/data/{id.lower()}/validation"
+
+
 SYMBOL_COLORS = {"N": "#3050F8", "O": "#FF0D0D", "S": "#FFFF30", "FE": "#E06633"}
 
 ENTITY_COLORS = [
@@ -1641,7 +2323,7 @@ ENTITY_COLORS = [
 def _color_by_symbol(repr: Representation, base: str = "#888888") -> Representation:
     repr.color(color=base)
     for symbol, color in SYMBOL_COLORS.items():
-        repr.color(selector=ComponentExpression(type_symbol=symbol), color=color)
+        repr.color(selector=_expr(type_symbol=symbol), color=color)
     return repr
 
 
@@ -1650,8 +2332,12 @@ def _color_by_entity(
 ) -> Representation:
     for i in range(n_entities):
         entity_id = str(i + 1)
-        repr.color(selector=ComponentExpression(label_entity_id=entity_id), color=colors[i % len(colors)])
+        repr.color(selector=_expr(label_entity_id=entity_id), color=colors[i % len(colors)])
         if use_symbol:
             for symbol, color in SYMBOL_COLORS.items():
-                repr.color(selector=ComponentExpression(label_entity_id=entity_id, type_symbol=symbol), color=color)
+                repr.color(selector=_expr(label_entity_id=entity_id, type_symbol=symbol), color=color)
     return repr
+
+
+# the routers also work without running `lifespan`, e.g. when mounted on another app
+_create_upstream_resources()
@@ -2,22 +2,59 @@
 Helper functions used by examples.py.
 """
 
+import gzip
+import hashlib
 import inspect
+from functools import lru_cache
 
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse, Response
+import orjson
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
 from pydantic import BaseModel, ValidationError
 
-import molviewspec
+import molviewspec.builder
+import molviewspec.nodes
 from molviewspec.nodes import validate_state_tree as validate_state_tree_internal
 from molviewspec.utils import get_major_version_tag
 
 router = APIRouter()
 
 
+def accepts_gzip(request: Request) -> bool:
+    """
+    Tell whether a gzip-encoded response is acceptable to the client, according to the `Accept-Encoding` header of its
+    request. Codings that are listed with a quality of 0 are refused, the wildcard covers gzip unless listed on its own.
+    """
+    qualities = {}
+    for token in request.headers.get("accept-encoding", "").split(","):
+        coding, *params = (part.strip() for part in token.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
 # Create a custom endpoint to serve the OpenAPI JSON for your Pydantic models
 @router.get("/models/openapi.json")
-async def models_openapi() -> JSONResponse:
+async def models_openapi(request: Request) -> Response:
+    content, gzipped = _models_openapi()
+    headers = {"Vary": "Accept-Encoding"}
+    if accepts_gzip(request):
+        # served precompressed, GZipMiddleware leaves responses that already declare their encoding alone
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=gzipped, media_type="application/json", headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=1)
+def _models_openapi() -> tuple[bytes, bytes]:
+    # node models don't change during the lifetime of the process, so the spec is only generated and compressed once
     openapi_models = {}
 
     # collect relevant impls
@@ -33,13 +70,29 @@ async def models_openapi() -> JSONResponse:
         "components": {"schemas": openapi_models},
     }
 
-    return JSONResponse(content=openapi_spec)
+    content = orjson.dumps(openapi_spec)
+    return content, gzip.compress(content, compresslevel=6)
 
 
 @router.get("/validate-state-tree")
 async def validate_state_tree(json: str) -> Response:
-    try:
-        validate_state_tree_internal(json)
-        return JSONResponse({"valid": True})
-    except ValidationError as e:
-        return JSONResponse(status_code=422, content=e.json())
+    # clients tend to validate the same tree repeatedly, so results are remembered by a digest of the input
+    key = hashlib.blake2b(json.encode(), digest_size=16).digest()
+    result = _VALIDATION_RESULTS.get(key)
+    if result is None:
+        try:
+            validate_state_tree_internal(json)
+            result = (200, orjson.dumps({"valid": True}))
+        except ValidationError as e:
+            result = (422, orjson.dumps(e.json()))
+        if len(_VALIDATION_RESULTS) >= _VALIDATION_RESULTS_SIZE:
+            # entries are kept in insertion order, so this drops the oldest one
+            del _VALIDATION_RESULTS[next(iter(_VALIDATION_RESULTS))]
+        _VALIDATION_RESULTS[key] = result
+    status_code, content = result
+    return Response(content=content, status_code=status_code, media_type="application/json")
+
+
+_VALIDATION_RESULTS: dict[bytes, tuple[int, bytes]] = {}
+"""Status code and serialized response of `validate_state_tree` by digest of the validated tree"""
+_VALIDATION_RESULTS_SIZE = 1024
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 
 from pydantic import BaseSettings
 
@@ -6,6 +7,9 @@ from pydantic import BaseSettings
 class _Settings(BaseSettings):
     TEST_DATA_DIR: Path = Path(__file__).absolute().parent.parent.parent / "test-data"
     VIEWER_DEFAULTS_DIR: Path = Path(__file__).absolute().parent.parent.parent / "viewer-defaults"
+    # when running behind nginx, set this to an internal location aliasing `TEST_DATA_DIR / "tmp"` (e.g. "/_tmp/") to
+    # let nginx send cached files instead of the app
+    ACCEL_REDIRECT_TMP_PREFIX: Optional[str] = None
 
 
 settings = _Settings()
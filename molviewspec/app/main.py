@@ -1,7 +1,9 @@
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
+from app.api.examples import lifespan
 from app.api.examples import router as examples_router
 from app.api.utils import router as utils_router
 
@@ -23,6 +25,8 @@ This API demonstrates the capabilities of that library and provides a range of e
 
 The output is a JSON file that can be opened by Mol* and will create the defined view.
               """,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +35,6 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=3)
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=1)
 
 app.include_router(router, prefix="/api/v1")
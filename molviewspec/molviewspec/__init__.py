@@ -1,6 +1,25 @@
 """MolViewSpec"""
 
+from typing import TYPE_CHECKING
+
 __version__ = "1.0.0"
 
-from molviewspec.builder import create_builder
-from molviewspec.nodes import ComponentExpression, validate_state_tree
+__all__ = ["create_builder", "ComponentExpression", "validate_state_tree"]
+
+if TYPE_CHECKING:
+    from molviewspec.builder import create_builder
+    from molviewspec.nodes import ComponentExpression, validate_state_tree
+
+
+def __getattr__(name: str):
+    # node models are only defined on first use, so that importing the package itself stays cheap
+    if name == "create_builder":
+        from molviewspec.builder import create_builder as value
+    elif name in ("ComponentExpression", "validate_state_tree"):
+        from molviewspec import nodes
+
+        value = getattr(nodes, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
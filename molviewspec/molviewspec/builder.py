@@ -5,12 +5,20 @@ Use this builder to navigate the creating of MolViewSpec files. Chain operations
 
 from __future__ import annotations
 
+import json
 import math
+import os
 from datetime import datetime, timezone
 from os import path
-from typing import Sequence
+from typing import Any, Iterable, Sequence
 
-from pydantic import BaseModel, PrivateAttr
+try:
+    import orjson
+except ImportError:  # optional, speeds up serialization of large states
+    orjson = None
+
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
 
 from molviewspec.nodes import (
     CameraParams,
@@ -22,6 +30,7 @@ from molviewspec.nodes import (
     ComponentExpression,
     ComponentFromSourceParams,
     ComponentFromUriParams,
+    ComponentInlineParams,
     ComponentSelectorT,
     DescriptionFormatT,
     DownloadParams,
@@ -48,6 +57,43 @@ from molviewspec.nodes import (
 )
 from molviewspec.utils import get_major_version_tag, make_params
 
+_VERSION_TAG = get_major_version_tag()
+"""Version of the spec written to the metadata of each state"""
+
+
+def _node_to_dict(root: Node) -> dict[str, Any]:
+    """
+    Convert a node tree to its JSON-ready form, equivalent to `root.dict(exclude_none=True)`. Walks the tree with an
+    explicit stack, so that arbitrarily deep trees neither recurse nor go through pydantic for every node.
+    """
+    result: dict[str, Any] = {}
+    stack = [(root, result)]
+    while stack:
+        node, out = stack.pop()
+        out["kind"] = node.kind
+        if node.params is not None:
+            out["params"] = {key: _param_to_json(value) for key, value in node.params.items()}
+        if node.children is not None:
+            children = out["children"] = [{} for _ in node.children]
+            stack.extend(zip(node.children, children))
+    return result
+
+
+def _param_to_json(value: Any) -> Any:
+    """Convert selection expressions (also in lists, tuples or sets) found in node params to dicts"""
+    if isinstance(value, BaseModel):
+        return value.dict(exclude_none=True)
+    if isinstance(value, (list, tuple, set, frozenset)) and any(isinstance(item, BaseModel) for item in value):
+        return [_param_to_json(item) for item in value]
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    """Encode param values neither JSON encoder supports natively, e.g. numpy scalars and arrays, sets or Decimal"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return pydantic_encoder(value)
+
 
 def create_builder() -> Root:
     """
@@ -57,16 +103,19 @@ def create_builder() -> Root:
     return Root()
 
 
-class _Base(BaseModel):
+class _Base:
     """
-    Internal base node from which all other nodes are derived.
+    Internal base node from which all other nodes are derived. Nodes are created via `Node.construct`, which skips
+    validation of their (builder-generated) content, set `MVS_VALIDATE=1` to validate the tree in `get_state`.
+    Builder steps are plain slotted objects (not models) as they are created for every call and never serialized.
     """
 
-    _root: Root = PrivateAttr()
-    _node: Node = PrivateAttr()
+    __slots__ = ("_root", "_node")
+
+    _root: Root
+    _node: Node
 
     def __init__(self, *, root: Root, node: Node) -> None:
-        super().__init__()
         self._root = root
         self._node = node
 
@@ -79,6 +128,15 @@ class _Base(BaseModel):
             self._node.children = []
         self._node.children.append(node)
 
+    def _add_children(self, nodes: Iterable[Node]) -> None:
+        """
+        Register multiple child nodes at once.
+        :param nodes: objs to add
+        """
+        if self._node.children is None:
+            self._node.children = []
+        self._node.children.extend(nodes)
+
 
 class Root(_Base):
     """
@@ -86,8 +144,11 @@ class Root(_Base):
     canvas color or camera position and functionality to eventually export this scene.
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
-        super().__init__(root=self, node=Node(kind="root"))
+        self._root = self
+        self._node = Node.construct(kind="root")
 
     def get_state(
         self,
@@ -105,14 +166,35 @@ class Root(_Base):
         :param indent: control format by specifying if and how to indent attributes
         :return: JSON string that resembles that whole state
         """
-        metadata = Metadata(
-            version=get_major_version_tag(),
+        return self._get_state_bytes(
+            title=title, description=description, description_format=description_format, indent=indent
+        ).decode()
+
+    def _get_state_bytes(
+        self,
+        *,
+        title: str | None = None,
+        description: str | None = None,
+        description_format: DescriptionFormatT | None = None,
+        indent: int | None = 2,
+    ) -> bytes:
+        """
+        Emits UTF-8 encoded JSON representation of the current state, see `get_state`.
+        """
+        metadata = Metadata.construct(
+            version=_VERSION_TAG,
             timestamp=datetime.now(timezone.utc).isoformat(),
             title=title,
             description=description,
             description_format=description_format,
         )
-        return State(root=self._node, metadata=metadata).json(exclude_none=True, indent=indent)
+        payload = {"root": _node_to_dict(self._node), "metadata": metadata.dict(exclude_none=True)}
+        if os.environ.get("MVS_VALIDATE") == "1":
+            # nodes are created without validation, opt in to checking the whole tree here (e.g. in tests)
+            State.validate(payload)
+        if orjson is not None and indent in (None, 2):
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2 if indent else 0, default=_json_default)
+        return json.dumps(payload, indent=indent, default=_json_default).encode()
 
     def save_state(
         self,
@@ -131,10 +213,11 @@ class Root(_Base):
         :param description_format: format of the description
         :param indent: control format by specifying if and how to indent attributes
         """
-        state = self.get_state(
+        state = self._get_state_bytes(
             title=title, description=description, description_format=description_format, indent=indent
         )
-        with open(destination, "w") as out:
+        # encoded once and written in one go
+        with open(destination, "wb") as out:
             out.write(state)
 
     def camera(
@@ -151,8 +234,8 @@ class Root(_Base):
         :param up: controls the rotation around the vector between target and position
         :return: this builder
         """
-        params = make_params(CameraParams, locals())
-        node = Node(kind="camera", params=params)
+        params = make_params(CameraParams, {"target": target, "position": position, "up": up})
+        node = Node.construct(kind="camera", params=params)
         self._add_child(node)
         return self
 
@@ -162,8 +245,8 @@ class Root(_Base):
         :param background_color: desired background color, either as SVG color name or hex code
         :return: this builder
         """
-        params = make_params(CanvasParams, locals())
-        node = Node(kind="canvas", params=params)
+        params = make_params(CanvasParams, {"background_color": background_color})
+        node = Node.construct(kind="canvas", params=params)
         self._add_child(node)
         return self
 
@@ -173,8 +256,8 @@ class Root(_Base):
         :param url: source of structure data
         :return: a builder that handles operations on the downloaded resource
         """
-        params = make_params(DownloadParams, locals())
-        node = Node(kind="download", params=params)
+        params = make_params(DownloadParams, {"url": url})
+        node = Node.construct(kind="download", params=params)
         self._add_child(node)
         return Download(node=node, root=self._root)
 
@@ -183,7 +266,7 @@ class Root(_Base):
         Experimental: Allows the definition of generic visuals such as spheres and lines.
         :return: a builder for generic visuals
         """
-        node = Node(kind="generic_visuals")
+        node = Node.construct(kind="generic_visuals")
         self._add_child(node)
         return GenericVisuals(node=node, root=self._root)
 
@@ -193,14 +276,16 @@ class Download(_Base):
     Builder step with operations needed after downloading structure data.
     """
 
+    __slots__ = ()
+
     def parse(self, *, format: ParseFormatT) -> Parse:
         """
         Parse the content by specifying the file format.
         :param format: specify the format of your structure data
         :return: a builder that handles operations on the parsed content
         """
-        params = make_params(ParseParams, locals())
-        node = Node(kind="parse", params=params)
+        params = make_params(ParseParams, {"format": format})
+        node = Node.construct(kind="parse", params=params)
         self._add_child(node)
         return Parse(node=node, root=self._root)
 
@@ -210,6 +295,8 @@ class Parse(_Base):
     Builder step with operations needed after parsing structure data.
     """
 
+    __slots__ = ()
+
     def model_structure(
         self,
         *,
@@ -224,8 +311,12 @@ class Parse(_Base):
         :param block_header: Reference a specific mmCIF or SDF data block by its block header
         :return: a builder that handles operations at structure level
         """
-        params = make_params(StructureParams, locals(), type="model")
-        node = Node(kind="structure", params=params)
+        params = make_params(
+            StructureParams,
+            {"model_index": model_index, "block_index": block_index, "block_header": block_header},
+            type="model",
+        )
+        node = Node.construct(kind="structure", params=params)
         self._add_child(node)
         return Structure(node=node, root=self._root)
 
@@ -245,8 +336,17 @@ class Parse(_Base):
         :param block_header: Reference a specific mmCIF or SDF data block by its block header
         :return: a builder that handles operations at structure level
         """
-        params = make_params(StructureParams, locals(), type="assembly")
-        node = Node(kind="structure", params=params)
+        params = make_params(
+            StructureParams,
+            {
+                "assembly_id": assembly_id,
+                "model_index": model_index,
+                "block_index": block_index,
+                "block_header": block_header,
+            },
+            type="assembly",
+        )
+        node = Node.construct(kind="structure", params=params)
         self._add_child(node)
         return Structure(node=node, root=self._root)
 
@@ -267,8 +367,18 @@ class Parse(_Base):
         :param block_header: Reference a specific mmCIF or SDF data block by its block header
         :return: a builder that handles operations at structure level
         """
-        params = make_params(StructureParams, locals(), type="symmetry")
-        node = Node(kind="structure", params=params)
+        params = make_params(
+            StructureParams,
+            {
+                "ijk_min": ijk_min,
+                "ijk_max": ijk_max,
+                "model_index": model_index,
+                "block_index": block_index,
+                "block_header": block_header,
+            },
+            type="symmetry",
+        )
+        node = Node.construct(kind="structure", params=params)
         self._add_child(node)
         return Structure(node=node, root=self._root)
 
@@ -287,8 +397,12 @@ class Parse(_Base):
         :param block_header: Reference a specific mmCIF or SDF data block by its block header
         :return: a builder that handles operations at structure level
         """
-        params = make_params(StructureParams, locals(), type="symmetry_mates")
-        node = Node(kind="structure", params=params)
+        params = make_params(
+            StructureParams,
+            {"radius": radius, "model_index": model_index, "block_index": block_index, "block_header": block_header},
+            type="symmetry_mates",
+        )
+        node = Node.construct(kind="structure", params=params)
         self._add_child(node)
         return Structure(node=node, root=self._root)
 
@@ -298,6 +412,8 @@ class Structure(_Base):
     Builder step with operations needed after defining the structure to work with.
     """
 
+    __slots__ = ()
+
     def component(
         self, *, selector: ComponentSelectorT | ComponentExpression | list[ComponentExpression] = "all"
     ) -> Component:
@@ -306,11 +422,91 @@ class Structure(_Base):
         :param selector: a predefined component selector or one or more component selection expressions
         :return: a builder that handles operations at component level
         """
-        params = make_params(ColorInlineParams, locals())
-        node = Node(kind="component", params=params)
+        params = make_params(ColorInlineParams, {"selector": selector})
+        node = Node.construct(kind="component", params=params)
         self._add_child(node)
         return Component(node=node, root=self._root)
 
+    def labels(
+        self,
+        *,
+        entries: Iterable[tuple[ComponentSelectorT | ComponentExpression | list[ComponentExpression], str]],
+    ) -> Structure:
+        """
+        Add text labels to multiple components/selections at once. Equivalent to calling
+        `component(selector=selector).label(text=text)` for each entry, but builds all nodes in a single pass.
+        :param entries: pairs of a selector (a predefined component selector or one or more component selection
+        expressions) and the label to add in 3D
+        :return: this builder
+        """
+        self._add_children(
+            Node.construct(
+                kind="component",
+                params=make_params(ComponentInlineParams, selector=selector),
+                children=[Node.construct(kind="label", params=make_params(LabelInlineParams, text=text))],
+            )
+            for selector, text in entries
+        )
+        return self
+
+    def tooltips(
+        self,
+        *,
+        entries: Iterable[tuple[ComponentSelectorT | ComponentExpression | list[ComponentExpression], str]],
+    ) -> Structure:
+        """
+        Add tooltips to multiple components/selections at once. Equivalent to calling
+        `component(selector=selector).tooltip(text=text)` for each entry, but builds all nodes in a single pass.
+        :param entries: pairs of a selector (a predefined component selector or one or more component selection
+        expressions) and the tooltip text shown on hover
+        :return: this builder
+        """
+        self._add_children(
+            Node.construct(
+                kind="component",
+                params=make_params(ComponentInlineParams, selector=selector),
+                children=[Node.construct(kind="tooltip", params=make_params(TooltipInlineParams, text=text))],
+            )
+            for selector, text in entries
+        )
+        return self
+
+    def components(
+        self,
+        *,
+        selectors: Iterable[ComponentSelectorT | ComponentExpression | list[ComponentExpression]],
+        representation: RepresentationTypeT = "cartoon",
+        color: ColorT | None = None,
+    ) -> Structure:
+        """
+        Add multiple components/selections that are all represented the same way. Equivalent to calling
+        `component(selector=selector).representation(type=representation).color(color=color)` for each selector, but
+        builds all nodes in a single pass.
+        :param selectors: predefined component selectors or component selection expressions, one per component
+        :param representation: the type of representation used for each component, defaults to 'cartoon'
+        :param color: optional color applied to each representation, using SVG color names or RGB hex code
+        :return: this builder
+        """
+        representation_params = make_params(RepresentationParams, {"type": representation})
+        color_params = (
+            make_params(ColorInlineParams, {"color": color, "selector": "all"}) if color is not None else None
+        )
+        self._add_children(
+            Node.construct(
+                kind="component",
+                params=make_params(ComponentInlineParams, selector=selector),
+                children=[
+                    Node.construct(
+                        kind="representation",
+                        params=representation_params,
+                        children=[Node.construct(kind="color", params=color_params)] if color_params else None,
+                    )
+                ],
+            )
+            for selector in selectors
+        )
+        return self
+
     def component_from_uri(
         self,
         *,
@@ -336,9 +532,21 @@ class Structure(_Base):
         :return: a builder that handles operations at component level
         """
         if isinstance(field_values, str):
-            field_values = [field_values]
-        params = make_params(ComponentFromUriParams, locals())
-        node = Node(kind="component_from_uri", params=params)
+            field_values = (field_values,)
+        params = make_params(
+            ComponentFromUriParams,
+            {
+                "uri": uri,
+                "format": format,
+                "category_name": category_name,
+                "field_name": field_name,
+                "block_header": block_header,
+                "block_index": block_index,
+                "schema": schema,
+                "field_values": field_values,
+            },
+        )
+        node = Node.construct(kind="component_from_uri", params=params)
         self._add_child(node)
         return Component(node=node, root=self._root)
 
@@ -363,9 +571,19 @@ class Structure(_Base):
         :return: a builder that handles operations at component level
         """
         if isinstance(field_values, str):
-            field_values = [field_values]
-        params = make_params(ComponentFromSourceParams, locals())
-        node = Node(kind="component_from_source", params=params)
+            field_values = (field_values,)
+        params = make_params(
+            ComponentFromSourceParams,
+            {
+                "category_name": category_name,
+                "field_name": field_name,
+                "block_header": block_header,
+                "block_index": block_index,
+                "schema": schema,
+                "field_values": field_values,
+            },
+        )
+        node = Node.construct(kind="component_from_source", params=params)
         self._add_child(node)
         return Component(node=node, root=self._root)
 
@@ -391,8 +609,19 @@ class Structure(_Base):
         :param schema: granularity/type of the selection
         :return: this builder
         """
-        params = make_params(LabelFromUriParams, locals())
-        node = Node(kind="label_from_uri", params=params)
+        params = make_params(
+            LabelFromUriParams,
+            {
+                "uri": uri,
+                "format": format,
+                "category_name": category_name,
+                "field_name": field_name,
+                "block_header": block_header,
+                "block_index": block_index,
+                "schema": schema,
+            },
+        )
+        node = Node.construct(kind="label_from_uri", params=params)
         self._add_child(node)
         return self
 
@@ -414,8 +643,17 @@ class Structure(_Base):
         :param schema: granularity/type of the selection
         :return: this builder
         """
-        params = make_params(LabelFromSourceParams, locals())
-        node = Node(kind="label_from_source", params=params)
+        params = make_params(
+            LabelFromSourceParams,
+            {
+                "category_name": category_name,
+                "field_name": field_name,
+                "block_header": block_header,
+                "block_index": block_index,
+                "schema": schema,
+            },
+        )
+        node = Node.construct(kind="label_from_source", params=params)
         self._add_child(node)
         return self
 
@@ -441,8 +679,19 @@ class Structure(_Base):
         :param schema: granularity/type of the selection
         :return: this builder
         """
-        params = make_params(TooltipFromUriParams, locals())
-        node = Node(kind="tooltip_from_uri", params=params)
+        params = make_params(
+            TooltipFromUriParams,
+            {
+                "uri": uri,
+                "format": format,
+                "category_name": category_name,
+                "field_name": field_name,
+                "block_header": block_header,
+                "block_index": block_index,
+                "schema": schema,
+            },
+        )
+        node = Node.construct(kind="tooltip_from_uri", params=params)
         self._add_child(node)
         return self
 
@@ -464,8 +713,17 @@ class Structure(_Base):
         :param schema: granularity/type of the selection
         :return: this builder
         """
-        params = make_params(TooltipFromSourceParams, locals())
-        node = Node(kind="tooltip_from_source", params=params)
+        params = make_params(
+            TooltipFromSourceParams,
+            {
+                "category_name": category_name,
+                "field_name": field_name,
+                "block_header": block_header,
+                "block_index": block_index,
+                "schema": schema,
+            },
+        )
+        node = Node.construct(kind="tooltip_from_source", params=params)
         self._add_child(node)
         return self
 
@@ -492,14 +750,14 @@ class Structure(_Base):
             if len(translation) != 3:
                 raise ValueError(f"Parameter `translation` must have length 3")
 
-        params = make_params(TransformParams, locals())
-        node = Node(kind="transform", params=params)
+        params = make_params(TransformParams, {"rotation": rotation, "translation": translation})
+        node = Node.construct(kind="transform", params=params)
         self._add_child(node)
         return self
 
     @staticmethod
     def _is_rotation_matrix(t: Sequence[float], eps: float = 0.005):
-        a00, a01, a02, a10, a11, a12, a20, a21, a22 = t[0], t[1], t[2], t[3], t[4], t[5], t[6], t[7], t[8]
+        a00, a01, a02, a10, a11, a12, a20, a21, a22 = t
 
         det3x3 = math.fabs(
             a00 * (a11 * a22 - a12 * a21) - a01 * (a10 * a22 - a12 * a20) + a02 * (a10 * a21 - a11 * a20)
@@ -512,14 +770,16 @@ class Component(_Base):
     Builder step with operations relevant for a particular component.
     """
 
+    __slots__ = ()
+
     def representation(self, *, type: RepresentationTypeT = "cartoon") -> Representation:
         """
         Add a representation for this component.
         :param type: the type of representation, defaults to 'cartoon'
         :return: a builder that handles operations at representation level
         """
-        params = make_params(RepresentationParams, locals())
-        node = Node(kind="representation", params=params)
+        params = make_params(RepresentationParams, {"type": type})
+        node = Node.construct(kind="representation", params=params)
         self._add_child(node)
         return Representation(node=node, root=self._root)
 
@@ -529,8 +789,8 @@ class Component(_Base):
         :param text: label to add in 3D
         :return: this builder
         """
-        params = make_params(LabelInlineParams, locals())
-        node = Node(kind="label", params=params)
+        params = make_params(LabelInlineParams, {"text": text})
+        node = Node.construct(kind="label", params=params)
         self._add_child(node)
         return self
 
@@ -540,8 +800,8 @@ class Component(_Base):
         :param text: text to show upon hover
         :return: this builder
         """
-        params = make_params(TooltipInlineParams, locals())
-        node = Node(kind="tooltip", params=params)
+        params = make_params(TooltipInlineParams, {"text": text})
+        node = Node.construct(kind="tooltip", params=params)
         self._add_child(node)
         return self
 
@@ -554,8 +814,8 @@ class Component(_Base):
         :param up: where is up relative to the view direction
         :return: this builder
         """
-        params = make_params(FocusInlineParams, locals())
-        node = Node(kind="focus", params=params)
+        params = make_params(FocusInlineParams, {"direction": direction, "up": up})
+        node = Node.construct(kind="focus", params=params)
         self._add_child(node)
         return self
 
@@ -565,6 +825,8 @@ class Representation(_Base):
     Builder step with operations relating to particular representations.
     """
 
+    __slots__ = ()
+
     def color_from_source(
         self,
         *,
@@ -583,8 +845,17 @@ class Representation(_Base):
         :param block_index: only applies when format is 'cif' or 'bcif'
         :return: this builder
         """
-        params = make_params(ColorFromSourceParams, locals())
-        node = Node(kind="color_from_source", params=params)
+        params = make_params(
+            ColorFromSourceParams,
+            {
+                "schema": schema,
+                "category_name": category_name,
+                "field_name": field_name,
+                "block_header": block_header,
+                "block_index": block_index,
+            },
+        )
+        node = Node.construct(kind="color_from_source", params=params)
         self._add_child(node)
         return self
 
@@ -610,8 +881,19 @@ class Representation(_Base):
         :param block_index: only applies when format is 'cif' or 'bcif'
         :return: this builder
         """
-        params = make_params(ColorFromUriParams, locals())
-        node = Node(kind="color_from_uri", params=params)
+        params = make_params(
+            ColorFromUriParams,
+            {
+                "schema": schema,
+                "uri": uri,
+                "format": format,
+                "category_name": category_name,
+                "field_name": field_name,
+                "block_header": block_header,
+                "block_index": block_index,
+            },
+        )
+        node = Node.construct(kind="color_from_uri", params=params)
         self._add_child(node)
         return self
 
@@ -624,8 +906,8 @@ class Representation(_Base):
         :param selector: optional selector, defaults to applying the color to the whole representation
         :return: this builder
         """
-        params = make_params(ColorInlineParams, locals())
-        node = Node(kind="color", params=params)
+        params = make_params(ColorInlineParams, {"color": color, "selector": selector})
+        node = Node.construct(kind="color", params=params)
         self._add_child(node)
         return self
 
@@ -635,6 +917,8 @@ class GenericVisuals(_Base):
     Experimental builder for custom, primitive visuals.
     """
 
+    __slots__ = ()
+
     def sphere(
         self,
         *,
@@ -653,8 +937,10 @@ class GenericVisuals(_Base):
         :param tooltip: optional tooltip to show upon hover
         :return:
         """
-        params = make_params(SphereParams, locals())
-        node = Node(kind="sphere", params=params)
+        params = make_params(
+            SphereParams, {"position": position, "radius": radius, "color": color, "label": label, "tooltip": tooltip}
+        )
+        node = Node.construct(kind="sphere", params=params)
         self._add_child(node)
         return self
 
@@ -678,7 +964,17 @@ class GenericVisuals(_Base):
         :param tooltip: optional tooltip to show upon hover
         :return:
         """
-        params = make_params(LineParams, locals())
-        node = Node(kind="line", params=params)
+        params = make_params(
+            LineParams,
+            {
+                "position1": position1,
+                "position2": position2,
+                "radius": radius,
+                "color": color,
+                "label": label,
+                "tooltip": tooltip,
+            },
+        )
+        node = Node.construct(kind="line", params=params)
         self._add_child(node)
         return self
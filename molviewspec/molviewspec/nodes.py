@@ -151,6 +151,10 @@ class ComponentExpression(BaseModel):
     atom_id: Optional[int] = Field(description="Unique atom identifier (`_atom_site.id`)")
     atom_index: Optional[int] = Field(description="0-based atom index in the source file")
 
+    class Config:
+        # immutable (and hashable), so that instances can be safely reused across selectors
+        frozen = True
+
 
 RepresentationTypeT = Literal["ball_and_stick", "cartoon", "surface"]
 ColorNamesT = Literal[
@@ -12,19 +12,27 @@ def make_params(params_type: Type[TParams], values=None, /, **more_values: objec
         values = {}
     result = {}
 
-    for field in params_type.__fields__.values():
+    fields = _PARAM_FIELDS.get(params_type)
+    if fields is None:
         # must use alias here to properly resolve goodies like `schema_`
-        key = field.alias
+        fields = tuple((field.alias, field.default) for field in params_type.__fields__.values())
+        _PARAM_FIELDS[params_type] = fields
+
+    for key, default in fields:
         if more_values.get(key) is not None:
             result[key] = more_values[key]
         elif values.get(key) is not None:
             result[key] = values[key]
-        elif field.default is not None:  # currently not used
-            result[key] = field.default
+        elif default is not None:  # currently not used
+            result[key] = default
 
     return result  # type: ignore
 
 
+_PARAM_FIELDS: dict[type[BaseModel], tuple[tuple[str, Any], ...]] = {}
+"""Keys and defaults of the fields of each params type, introspected once per type rather than for every node"""
+
+
 def get_major_version_tag() -> str:
     """
     Reports the version of this implementation. Omits minor and patch values if v1+, omits patch value if in v0.
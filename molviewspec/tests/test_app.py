@@ -0,0 +1,97 @@
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import examples
+from app.api.examples import router as examples_router
+from app.api.utils import router as utils_router
+from app.config import settings
+from app.main import app
+
+# without the app's GZipMiddleware, which compresses on its own terms, so only the precompressed responses are seen
+_app = FastAPI()
+_app.include_router(examples_router, prefix="/examples")
+_app.include_router(utils_router, prefix="/utils")
+_client = TestClient(_app)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, gzipped",
+    [
+        ("gzip", True),
+        ("deflate, GZIP;q=0.5", True),
+        ("*", True),
+        ("", False),
+        ("gzip;q=0", False),
+        ("gzip; q=0.000, deflate", False),
+        ("*, gzip;q=0", False),
+        ("x-gzip", False),
+        ("identity", False),
+    ],
+)
+def test_precompressed_response_encoding(accept_encoding: str, gzipped: bool):
+    for path in ("/examples/load", "/utils/models/openapi.json"):
+        response = _client.get(path, headers={"Accept-Encoding": accept_encoding})
+        assert response.status_code == 200
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert response.headers.get("Content-Encoding") == ("gzip" if gzipped else None)
+        assert response.json()
+
+
+def _upstream(request: httpx.Request) -> httpx.Response:
+    id = request.url.path.rsplit("/", 1)[-1]
+    if id.endswith(".bcif"):
+        return httpx.Response(200, content=b"BCIF")
+    if id == "1cbs":
+        residues = [{"residue_number": 5, "outlier_types": ["clashes"]}]
+        chains = [{"struct_asym_id": "A", "models": [{"residues": residues}]}]
+        return httpx.Response(200, json={id: {"molecules": [{"chains": chains}]}})
+    if id == "2nnj":
+        raise httpx.ConnectError("upstream unreachable", request=request)
+    return httpx.Response(404 if id == "9xyz" else 500, json={})
+
+
+@pytest.fixture
+def upstream(monkeypatch, tmp_path):
+    """Serve upstream requests by `_upstream` and keep anything cached away from the shared test data"""
+    monkeypatch.setattr(
+        examples, "_create_http_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(_upstream))
+    )
+    monkeypatch.setattr(examples, "_HTTP_CLIENT", examples._create_http_client())
+    monkeypatch.setattr(examples, "_VALIDATION_DATA_CACHE", {})
+    monkeypatch.setattr(examples, "_CACHED_LOCAL_BCIF", set())
+    monkeypatch.setattr(settings, "TEST_DATA_DIR", tmp_path)
+
+
+def test_validation_data_batch_reports_failures_per_entry(upstream):
+    response = _client.get("/examples/data/validation", params={"ids": "1CBS,9xyz,8abc,2nnj"})
+    assert response.status_code == 200
+    data = response.json()
+    assert list(data) == ["1cbs", "9xyz", "8abc", "2nnj"]
+    assert data["1cbs"] == [{"label_seq_id": 5, "label_asym_id": "A", "color": "#ffff00", "tooltip": "clashes"}]
+    assert data["9xyz"]["status"] == 404
+    assert data["8abc"]["status"] == 502
+    assert data["2nnj"]["status"] == 502
+    assert all("error" in data[id] for id in ("9xyz", "8abc", "2nnj"))
+
+    assert _client.get("/examples/data/9xyz/validation").status_code == 404
+    assert _client.get("/examples/data/8abc/validation").status_code == 502
+
+
+def test_lifespan_can_be_entered_twice(upstream):
+    for id in ("1cbs", "2nnj"):
+        with TestClient(app) as client:
+            response = client.get("/api/v1/examples/data/1cbs/validation")
+            assert response.status_code == 200
+            # the prefetch workers of the previous lifespan ran in another event loop
+            assert client.post("/api/v1/examples/testing/prefetch", params={"ids": id}).json() == [id]
+            deadline = time.monotonic() + 5
+            while not (settings.TEST_DATA_DIR / "tmp" / f"{id}.bcif").exists():
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+        # have the next lifespan ask upstream again
+        examples._VALIDATION_DATA_CACHE.clear()
+        (settings.TEST_DATA_DIR / "tmp" / "1cbs_validation.json").unlink()
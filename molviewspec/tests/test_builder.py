@@ -0,0 +1,95 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from molviewspec import ComponentExpression, create_builder
+
+
+def _state(builder, indent: int | None = 2) -> dict:
+    state = json.loads(builder.get_state(indent=indent))
+    del state["metadata"]["timestamp"]
+    return state
+
+
+def _structure(builder):
+    return builder.download(url="https://example.org/1cbs.bcif").parse(format="bcif").model_structure()
+
+
+def test_tuple_selector_is_serialized():
+    builder = create_builder()
+    structure = _structure(builder)
+    selector = (ComponentExpression(label_asym_id="A"), ComponentExpression(label_asym_id="B", label_seq_id=5))
+    structure.component(selector=selector).representation()
+
+    component = _state(builder)["root"]["children"][0]["children"][0]["children"][0]["children"][0]
+    assert component["params"]["selector"] == [
+        {"label_asym_id": "A"},
+        {"label_asym_id": "B", "label_seq_id": 5},
+    ]
+    # indentation other than 2 is encoded by the stdlib json module
+    assert _state(builder, indent=4) == _state(builder)
+
+
+_SELECTORS = [
+    "ligand",
+    ComponentExpression(label_asym_id="A", beg_label_seq_id=9, end_label_seq_id=83),
+    [ComponentExpression(label_asym_id="B"), ComponentExpression(label_asym_id="C", atom_id=4016)],
+]
+
+
+def test_labels_match_chained_form():
+    entries = [(selector, f"label {i}") for i, selector in enumerate(_SELECTORS)]
+    bulk = create_builder()
+    _structure(bulk).labels(entries=entries)
+    chained = create_builder()
+    structure = _structure(chained)
+    for selector, text in entries:
+        structure.component(selector=selector).label(text=text)
+    assert _state(bulk) == _state(chained)
+
+
+def test_tooltips_match_chained_form():
+    entries = [(selector, f"tooltip {i}") for i, selector in enumerate(_SELECTORS)]
+    bulk = create_builder()
+    _structure(bulk).tooltips(entries=entries)
+    chained = create_builder()
+    structure = _structure(chained)
+    for selector, text in entries:
+        structure.component(selector=selector).tooltip(text=text)
+    assert _state(bulk) == _state(chained)
+
+
+def test_components_match_chained_form():
+    for color in (None, "#ff0000"):
+        bulk = create_builder()
+        _structure(bulk).components(selectors=_SELECTORS, representation="ball_and_stick", color=color)
+        chained = create_builder()
+        structure = _structure(chained)
+        for selector in _SELECTORS:
+            representation = structure.component(selector=selector).representation(type="ball_and_stick")
+            if color is not None:
+                representation.color(color=color)
+        assert _state(bulk) == _state(chained)
+
+
+def test_transform_from_numpy_array():
+    np = pytest.importorskip("numpy")
+    builder = create_builder()
+    _structure(builder).transform(rotation=np.eye(3).flatten(), translation=np.array([1, 2, 3]))
+
+    transform = _state(builder)["root"]["children"][0]["children"][0]["children"][0]["children"][0]
+    assert transform["params"] == {"rotation": [1, 0, 0, 0, 1, 0, 0, 0, 1], "translation": [1, 2, 3]}
+    assert _state(builder, indent=4) == _state(builder)
+
+
+def test_params_without_native_json_support():
+    builder = create_builder()
+    _structure(builder).transform(translation=(Decimal("1.5"), 2, 3))
+    builder.canvas(background_color={"#ffffff"})
+
+    state = _state(builder)
+    assert state["root"]["children"][1]["params"] == {"background_color": ["#ffffff"]}
+    transform = state["root"]["children"][0]["children"][0]["children"][0]["children"][0]
+    assert transform["params"] == {"translation": [1.5, 2, 3]}
+    assert _state(builder, indent=4) == state